@@ -6,6 +6,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.http import StreamingHttpResponse
 from utils.sse import SSEHttpResponse
+from utils.renderers import ORJSONRenderer
 from typing import List, Optional, Dict, Any
 import json
 import uuid
@@ -22,7 +23,8 @@ a2a_api = NinjaAPI(
     title="Yes Human A2A Server",
     version="1.0.0",
     description="Agent-to-Agent communication server",
-    urls_namespace="a2a"
+    urls_namespace="a2a",
+    renderer=ORJSONRenderer()
 )
 # Minimal JSON-RPC 2.0 handler to support a2a-inspector chat
 class JSONRPCRequest(Schema):
@@ -11,12 +11,13 @@ from ninja import NinjaAPI
 from pydantic import BaseModel
 
 from utils.sse import SSEHttpResponse
+from utils.renderers import ORJSONRenderer
 from streaming.generators import AnthropicSSEGenerator
 from agent.graph import astream_agent_tokens
 
 logger = logging.getLogger(__name__)
 
-agent_api = NinjaAPI(urls_namespace="agent")
+agent_api = NinjaAPI(urls_namespace="agent", renderer=ORJSONRenderer())
 
 # Import thread services
 from apps.threads.services import handle_thread_title_generation, generate_thread_title_with_llm, update_thread_title
@@ -105,9 +106,10 @@ async def stream(request):
     user = None
     try:
         from yeshuman.api import get_user_from_token
-        auth_header = request.headers.get('authorization', '')
-        if auth_header.startswith('Bearer '):
-            logger.info(f"🔐 Agent auth header: '{auth_header[:50]}...'")
+        from apps.accounts.utils import bearer_token
+        token = bearer_token(request)
+        if token is not None:
+            logger.info("🔐 Agent request carries a bearer token")
             user = await get_user_from_token(request)
             logger.info(f"🔐 Agent user extracted: {user}, type: {type(user)}, is_anon: {user.is_anonymous if user else 'N/A'}")
             if user and not user.is_anonymous:
@@ -7,7 +7,9 @@ Handles retrieval, classification, storage, and deduplication of user memories.
 import os
 import time
 import logging
-from typing import Dict, List, Any, Tuple
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Any, Set, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
@@ -36,6 +38,13 @@ def _get_memory_state(user_id: str) -> Dict[str, Any]:
     return MEMORY_STATE[user_id]
 
 
+# Per-user recent text hashes for cheap exact-duplicate checks; the set
+# mirrors the deque for O(1) membership
+RECENT_HASHES: Dict[str, Deque[str]] = {}
+_RECENT_HASH_SETS: Dict[str, Set[str]] = {}
+_RECENT_HASHES_LOCK = threading.Lock()
+
+
 def _normalize_text(text: str) -> str:
     if not text:
         return ""
@@ -131,19 +140,20 @@ def recent_lru_check(user_id: str, text_hash: str, max_keep: int = 32) -> bool:
     Returns:
         True if hash was seen recently, False otherwise
     """
-    # This would need to be made thread-safe for production
-    # For now, using simple in-memory dict
-    user_key = f"recent_{user_id}"
-    if user_key not in globals():
-        globals()[user_key] = []
-
-    bucket = globals()[user_key]
-    if text_hash in bucket:
-        return True
-    bucket.append(text_hash)
-    if len(bucket) > max_keep:
-        del bucket[0: len(bucket) - max_keep]
-    return False
+    with _RECENT_HASHES_LOCK:
+        bucket = RECENT_HASHES.get(user_id)
+        if bucket is None or bucket.maxlen != max_keep:
+            bucket = deque(bucket or (), maxlen=max_keep)
+            RECENT_HASHES[user_id] = bucket
+            _RECENT_HASH_SETS[user_id] = set(bucket)
+        seen = _RECENT_HASH_SETS[user_id]
+        if text_hash in seen:
+            return True
+        if len(bucket) == max_keep:
+            seen.discard(bucket[0])
+        bucket.append(text_hash)
+        seen.add(text_hash)
+        return False
 
 
 async def is_near_duplicate(user_id: str, text: str, threshold: float = 0.9, recent_n: int = 20) -> Tuple[bool, float]:
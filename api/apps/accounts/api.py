@@ -3,7 +3,6 @@ Authentication API using Django Ninja with JWT.
 """
 import jwt
 from datetime import datetime, timedelta
-from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
@@ -11,16 +10,39 @@ from ninja import Router, Schema
 from typing import Optional
 from pydantic import field_validator
 from asgiref.sync import sync_to_async
+from .utils import JWT_ALGORITHM, JWT_SECRET_KEY, bearer_token, verify_token
 
 # Create router for auth endpoints
 auth_router = Router()
 
-# JWT settings
-JWT_SECRET_KEY = settings.SECRET_KEY
-JWT_ALGORITHM = 'HS256'
+# JWT lifetime (the key and algorithm are shared from .utils)
 JWT_EXPIRATION_DELTA = timedelta(hours=24)
 
 
+async def _authenticate_request(request):
+    """
+    Resolve the request's bearer token to a User.
+
+    Returns ``(user, None)`` on success or ``(None, error)`` with the message
+    for a 401 response.
+    """
+    token = bearer_token(request)
+    if token is None:
+        return None, "No token provided"
+
+    try:
+        user_id = await verify_token(token)
+    except jwt.ExpiredSignatureError:
+        return None, "Token expired"
+    except jwt.InvalidTokenError:
+        return None, "Invalid token"
+
+    user = await get_user_model().objects.filter(id=user_id).afirst()
+    if user is None:
+        return None, "User not found"
+    return user, None
+
+
 class RegisterSchema(Schema):
     """Schema for user registration."""
     username: str
@@ -192,29 +214,15 @@ async def login(request, data: LoginSchema):
 @auth_router.get("/me", response={200: UserResponse, 401: dict})
 async def get_current_user(request):
     """Get current authenticated user information."""
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
+    user, error = await _authenticate_request(request)
+    if error:
+        return 401, {"error": error}
 
-        return 200, UserResponse(
-            id=user.id,
-            username=user.username,
-            email=user.email
-        )
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    return 200, UserResponse(
+        id=user.id,
+        username=user.username,
+        email=user.email
+    )
 
 
 @auth_router.get("/focus", response={200: FocusResponse, 401: dict})
@@ -222,36 +230,22 @@ async def get_user_focus(request):
     """Get current user focus and available options."""
     from .utils import get_available_foci_for_user, negotiate_user_focus
 
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    user, error = await _authenticate_request(request)
+    if error:
+        return 401, {"error": error}
 
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
+    # Set request.user for session functions
+    request.user = user
 
-    token = auth_header.split(' ')[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await User.objects.aget(id=payload['user_id'])
+    current_focus, error = await negotiate_user_focus(request)
+    available_foci = await get_available_foci_for_user(user)
+    focus_confirmed = request.session.get('focus_confirmed', False)
 
-        # Set request.user for session functions
-        request.user = user
-
-        current_focus, error = await negotiate_user_focus(request)
-        available_foci = await get_available_foci_for_user(user)
-        focus_confirmed = request.session.get('focus_confirmed', False)
-
-        return 200, FocusResponse(
-            current_focus=current_focus,
-            available_foci=available_foci,
-            focus_confirmed=focus_confirmed
-        )
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    return 200, FocusResponse(
+        current_focus=current_focus,
+        available_foci=available_foci,
+        focus_confirmed=focus_confirmed
+    )
 
 
 @auth_router.post("/focus", response={200: dict, 400: dict, 401: dict})
@@ -261,80 +255,46 @@ async def set_user_focus(request, data: SetFocusRequest):
     import logging
     logger = logging.getLogger(__name__)
 
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    logger.info(f"🔐 Focus POST auth header: '{auth_header}'")
+    user, error = await _authenticate_request(request)
+    if error:
+        logger.error(f"🔐 Focus POST authentication failed: {error}")
+        return 401, {"error": error}
+    logger.info(f"🔐 Found user: {user.username} (id: {user.id})")
 
-    if not auth_header.startswith('Bearer '):
-        logger.error("🔐 No Bearer token in header")
-        return 401, {"error": "No token provided"}
+    # Set request.user for session functions
+    request.user = user
 
-    token = auth_header.split(' ')[1]
-    logger.info(f"🔐 Extracted token: '{token[:20]}...'")
+    available_foci = await get_available_foci_for_user(user)
+    if data.focus not in available_foci:
+        return 400, {"error": f"Focus '{data.focus}' not available for this user"}
 
-    try:
-        logger.info(f"🔐 Decoding with secret: {JWT_SECRET_KEY[:10]}... and algo: {JWT_ALGORITHM}")
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        logger.info(f"🔐 Decoded payload: {payload}")
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
-        logger.info(f"🔐 Found user: {user.username} (id: {user.id})")
-
-        # Set request.user for session functions
-        request.user = user
-        logger.info(f"🔐 Set request.user to: {request.user}")
-
-        available_foci = await get_available_foci_for_user(user)
-        if data.focus not in available_foci:
-            return 400, {"error": f"Focus '{data.focus}' not available for this user"}
-
-        # Set the focus
-        current_focus, error = await negotiate_user_focus(request, data.focus)
+    # Set the focus
+    current_focus, error = await negotiate_user_focus(request, data.focus)
 
-        if error:
-            return 400, {"error": error}
+    if error:
+        return 400, {"error": error}
 
-        return 200, {
-            "success": True,
-            "message": f"Focus set to {current_focus}",
-            "current_focus": current_focus,
-            "available_foci": available_foci
-        }
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    return 200, {
+        "success": True,
+        "message": f"Focus set to {current_focus}",
+        "current_focus": current_focus,
+        "available_foci": available_foci
+    }
 
 
 @auth_router.get("/groups", response={200: UserGroupsResponse, 401: dict})
 async def get_user_groups(request):
     """Get user's current groups and available selectable groups."""
     from .utils import get_selectable_groups_for_user
-    from django.conf import settings
 
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    user, error = await _authenticate_request(request)
+    if error:
+        return 401, {"error": error}
 
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
+    # Get selectable groups with assignment status
+    groups_data = await get_selectable_groups_for_user(user)
 
-    token = auth_header.split(' ')[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
-
-        # Get selectable groups with assignment status
-        groups_data = await get_selectable_groups_for_user(user)
-
-        return 200, UserGroupsResponse(groups=groups_data)
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    return 200, UserGroupsResponse(groups=groups_data)
 
 
 @auth_router.post("/groups", response={200: dict, 400: dict, 401: dict})
@@ -344,18 +304,11 @@ async def update_user_groups(request, data: UpdateGroupsRequest):
     import logging
     logger = logging.getLogger(__name__)
 
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
+    user, error = await _authenticate_request(request)
+    if error:
+        return 401, {"error": error}
 
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
-
         # Update user's groups
         result = await update_user_groups(user, data.group_updates)
 
@@ -367,12 +320,6 @@ async def update_user_groups(request, data: UpdateGroupsRequest):
             "message": result['message'],
             "groups_updated": result['groups_updated']
         }
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
     except Exception as e:
         logger.error(f"Error updating user groups: {e}")
         return 400, {"error": "Failed to update groups"}
@@ -2,6 +2,8 @@
 Django models for accounts app.
 """
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
@@ -36,3 +38,27 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.email or self.username
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def _forget_employer_flags_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Any groups mutation, from either side (admin edits, user.groups.remove(),
+    # group.user_set.add()), invalidates the cached employer flags it touches
+    from .utils import forget_employer_flags
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        forget_employer_flags([instance.pk])
+    elif action == 'pre_clear':
+        # clear() passes no pk_set, so collect the members before they go
+        forget_employer_flags(list(instance.user_set.values_list('pk', flat=True)))
+    else:
+        forget_employer_flags(pk_set)
+
+
+@receiver(post_delete, sender=User)
+def _forget_deleted_user_employer_flag(sender, instance, **kwargs):
+    # A deleted user's token may still resolve from the token cache until it
+    # expires; dropping the flag sends the employer check back to the DB
+    from .utils import forget_employer_flags
+    forget_employer_flags([instance.pk])
@@ -250,3 +250,19 @@ class AccountsAPITestCase(TestCase):
         data = response.json()
         # The API might return "No token provided" for expired tokens too
         self.assertTrue("No token provided" in data["error"] or "Token expired" in data["error"])
+
+    def test_get_current_user_token_without_expiry(self):
+        """Tokens without an exp claim are rejected."""
+        import jwt
+        from django.conf import settings
+
+        self.client.post("/accounts/register", json=self.test_user_data)
+        user = User.objects.get(username=self.test_user_data["username"])
+        token = jwt.encode({'user_id': user.id}, settings.SECRET_KEY, algorithm='HS256')
+
+        response = self.client.get("/accounts/me", headers={
+            "HTTP_AUTHORIZATION": f"Bearer {token}"
+        })
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Invalid token", response.json()["error"])
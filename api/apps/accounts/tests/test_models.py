@@ -0,0 +1,40 @@
+"""
+Tests for accounts app models.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase
+from apps.accounts.utils import employer_cache_key
+
+User = get_user_model()
+
+
+class EmployerFlagInvalidationTest(TestCase):
+    """Cached employer flags are dropped on any groups change or user delete."""
+
+    def setUp(self):
+        self.group = Group.objects.get_or_create(name="employer")[0]
+        self.user = User.objects.create_user(username="employer", email="employer@example.com", password="password123")
+        self.user.groups.add(self.group)
+        self.key = employer_cache_key(self.user.pk)
+        cache.set(self.key, True)
+
+    def test_remove_from_user_side(self):
+        """user.groups.remove() drops the flag."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+        self.assertIsNone(cache.get(self.key))
+
+    def test_clear_from_group_side(self):
+        """group.user_set.clear() drops the flag of every former member."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.user_set.clear()
+        self.assertIsNone(cache.get(self.key))
+
+    def test_user_delete(self):
+        """Deleting the user drops the flag."""
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).delete()
+        self.assertIsNone(cache.get(self.key))
@@ -2,10 +2,77 @@
 Utilities for user focus and session management in TalentCo.
 """
 
+import hashlib
+import jwt
+import time
+from django.conf import settings
 from django.contrib.auth.models import Group
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 
+# JWT settings, shared by the token issuer and every bearer-token endpoint
+JWT_SECRET_KEY = settings.SECRET_KEY
+JWT_ALGORITHM = 'HS256'
+
+# One decoder with the algorithm list and required claims fixed up front;
+# tokens from the accounts API always carry both claims
+_JWT = jwt.PyJWT()
+_JWT_ALGORITHMS = (JWT_ALGORITHM,)
+_JWT_OPTIONS = {'require': ['exp', 'user_id']}
+
+# A verified token's user id is cached for at most this long (or until the
+# token expires, if sooner), so repeat requests skip the HS256 check.
+#
+# CACHES is not configured, so this and the per-user employer flag below use
+# Django's default LocMemCache, which is private to each process. The signal
+# handlers in .models drop stale employer flags only in the process that made
+# the change; deployments running several workers need a shared cache backend
+# (e.g. Redis) for revocations to reach every worker before the TTLs run out.
+TOKEN_CACHE_TTL = 30
+
+
+def bearer_token(request):
+    """Token from the request's ``Authorization: Bearer <token>`` header, or None."""
+    scheme, _, token = request.headers.get('authorization', '').partition(' ')
+    return token if scheme == 'Bearer' else None
+
+
+async def verify_token(token: str):
+    """
+    Verify a JWT and return its ``user_id`` claim, from the cache when recently
+    verified.
+
+    Raises the same ``jwt`` exceptions as ``jwt.decode``, including
+    MissingRequiredClaimError for tokens without ``exp`` or ``user_id``;
+    tokens that fail verification are never cached.
+    """
+    key = f"accounts:token-user:{hashlib.blake2b(token.encode('utf-8'), digest_size=16).hexdigest()}"
+    user_id = await cache.aget(key)
+    if user_id is None:
+        payload = _JWT.decode(token, JWT_SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS)
+        user_id = payload['user_id']
+        ttl = min(TOKEN_CACHE_TTL, payload['exp'] - time.time())
+        if ttl > 0:
+            await cache.aset(key, user_id, int(ttl))
+    return user_id
+
+
+def employer_cache_key(user_id) -> str:
+    """Cache key of the user's employer flag (see organisations' check_employer_permissions)."""
+    return f"employer:{user_id}"
+
+
+def forget_employer_flags(user_ids) -> None:
+    """
+    Drop the users' cached employer flags once the current transaction
+    commits (at once outside one), so the next check reads committed groups.
+    """
+    keys = [employer_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
 
 async def get_available_foci_for_user(user):
     """
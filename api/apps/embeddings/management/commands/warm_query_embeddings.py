@@ -0,0 +1,24 @@
+"""
+Management command to pre-warm cached embeddings for popular search queries.
+"""
+
+from django.core.management.base import BaseCommand
+from apps.embeddings.services import warm_query_embeddings
+
+
+class Command(BaseCommand):
+    help = 'Pre-compute embeddings for the most frequently searched queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Number of popular queries to warm (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        generated = warm_query_embeddings(limit=options['limit'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Pre-warmed {generated} query embeddings')
+        )
@@ -3,14 +3,76 @@ Embedding generation services for TalentCo semantic matching.
 Handles OpenAI text-embedding-3-small integration with batch processing.
 """
 
+import atexit
 import openai
+import hashlib
+import httpx
 import logging
-from typing import List, Optional, Union
+import numpy as np
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Union
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"  # 1536 dimensions
+
+# How long query embeddings stay in the shared Django cache (seconds)
+QUERY_EMBEDDING_CACHE_TTL = 3600
+
+# Cache key for miss counts of normalized queries, used to pre-warm embeddings
+POPULAR_QUERIES_CACHE_KEY = "emb:popular_queries"
+POPULAR_QUERIES_MAX = 500
+
+# Connection limits shared by the pooled sync and async HTTP clients
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=40)
+
+_clients_lock = threading.Lock()
+_sync_client: Optional[openai.OpenAI] = None
+_async_client: Optional[openai.AsyncOpenAI] = None
+
+
+def _get_client() -> openai.OpenAI:
+    """Process-wide OpenAI client so keep-alive connections are reused across services."""
+    global _sync_client
+    if _sync_client is None:
+        with _clients_lock:
+            if _sync_client is None:
+                _sync_client = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=httpx.Client(limits=_HTTP_LIMITS, timeout=30.0),
+                )
+                atexit.register(_sync_client.close)
+    return _sync_client
+
+
+def _get_async_client() -> openai.AsyncOpenAI:
+    """Process-wide AsyncOpenAI client backed by a pooled httpx.AsyncClient."""
+    global _async_client
+    if _async_client is None:
+        with _clients_lock:
+            if _async_client is None:
+                _async_client = openai.AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=30.0),
+                )
+    return _async_client
+
+
+def l2_normalize(embedding: List[float]) -> List[float]:
+    """
+    Scale an embedding to unit length, so stored vectors can be compared by
+    inner product alone (cosine without per-row norms).
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    if norm == 0.0:
+        return list(embedding)
+    return (vector / norm).tolist()
+
 
 class EmbeddingService:
     """
@@ -19,19 +81,20 @@ class EmbeddingService:
     """
     
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "text-embedding-3-small"  # 1536 dimensions
+        self.client = _get_client()
+        self.model = EMBEDDING_MODEL
         self.max_batch_size = 2048  # OpenAI limit
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str, dimensions: Optional[int] = None) -> List[float]:
         """
         Generate single embedding for text.
         
         Args:
             text: Text to embed
+            dimensions: Optional truncated output size (defaults to the model's 1536)
             
         Returns:
-            List of 1536 floats representing the embedding
+            List of floats representing the embedding (1536 unless dimensions is set)
             
         Raises:
             Exception: If OpenAI API call fails
@@ -40,13 +103,46 @@ class EmbeddingService:
             raise ValueError("Text cannot be empty")
             
         try:
+            extra = {"dimensions": dimensions} if dimensions else {}
             response = self.client.embeddings.create(
                 model=self.model,
                 input=text,
-                encoding_format="float"
+                encoding_format="float",
+                **extra
             )
             
-            embedding = response.data[0].embedding
+            embedding = l2_normalize(response.data[0].embedding)
+            logger.info(f"Generated embedding for text length: {len(text)}")
+            return embedding
+            
+        except Exception as e:
+            logger.error(f"Failed to generate embedding: {e}")
+            raise
+    
+    async def agenerate_embedding(self, text: str, dimensions: Optional[int] = None) -> List[float]:
+        """
+        Async variant of generate_embedding using the pooled AsyncOpenAI client.
+        
+        Args:
+            text: Text to embed
+            dimensions: Optional truncated output size (defaults to the model's 1536)
+            
+        Returns:
+            List of floats representing the embedding (1536 unless dimensions is set)
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+            
+        try:
+            extra = {"dimensions": dimensions} if dimensions else {}
+            response = await _get_async_client().embeddings.create(
+                model=self.model,
+                input=text,
+                encoding_format="float",
+                **extra
+            )
+            
+            embedding = l2_normalize(response.data[0].embedding)
             logger.info(f"Generated embedding for text length: {len(text)}")
             return embedding
             
@@ -96,7 +192,7 @@ class EmbeddingService:
             # Reconstruct results in original order
             embeddings = [[] for _ in texts]
             for valid_idx, original_idx in enumerate(text_indices):
-                embeddings[original_idx] = response.data[valid_idx].embedding
+                embeddings[original_idx] = l2_normalize(response.data[valid_idx].embedding)
             
             logger.info(f"Generated {len(valid_texts)} embeddings from {len(texts)} texts")
             return embeddings
@@ -149,7 +245,7 @@ class EmbeddingService:
                     # Bulk update
                     if valid_instances:
                         type(valid_instances[0]).objects.bulk_update(
-                            valid_instances, ['embedding']
+                            valid_instances, ['embedding'], batch_size=500
                         )
                 
                 logger.info(f"Updated embeddings for {len(valid_instances)} instances")
@@ -160,6 +256,137 @@ class EmbeddingService:
 
 
 # Convenience functions for common operations
+def _normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _query_cache_key(normalized_query: str) -> str:
+    # Keyed on the model too, so switching models never serves stale vectors
+    digest = hashlib.blake2b(normalized_query.encode('utf-8'), digest_size=16).hexdigest()
+    return f"qemb:{EMBEDDING_MODEL}:{digest}"
+
+
+def _count_query_miss(counts: Optional[dict], normalized_query: str) -> dict:
+    counts = counts or {}
+    counts[normalized_query] = counts.get(normalized_query, 0) + 1
+    if len(counts) > POPULAR_QUERIES_MAX:
+        counts = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True)[:POPULAR_QUERIES_MAX])
+    return counts
+
+
+def _record_query_miss(normalized_query: str) -> None:
+    """Count a cache miss so warm_query_embeddings() can pre-embed hot queries."""
+    counts = _count_query_miss(cache.get(POPULAR_QUERIES_CACHE_KEY), normalized_query)
+    cache.set(POPULAR_QUERIES_CACHE_KEY, counts, None)
+
+
+async def _arecord_query_miss(normalized_query: str) -> None:
+    counts = _count_query_miss(await cache.aget(POPULAR_QUERIES_CACHE_KEY), normalized_query)
+    await cache.aset(POPULAR_QUERIES_CACHE_KEY, counts, None)
+
+
+# Per-process LRU in front of the shared Django cache (shared by sync and async paths)
+_QUERY_LRU_MAXSIZE = 4096
+_query_lru: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+_query_lru_lock = threading.Lock()
+
+
+def _lru_get(normalized_query: str) -> Optional[Tuple[float, ...]]:
+    with _query_lru_lock:
+        embedding = _query_lru.get(normalized_query)
+        if embedding is not None:
+            _query_lru.move_to_end(normalized_query)
+        return embedding
+
+
+def _lru_put(normalized_query: str, embedding: List[float]) -> Tuple[float, ...]:
+    embedding = tuple(embedding)
+    with _query_lru_lock:
+        _query_lru[normalized_query] = embedding
+        _query_lru.move_to_end(normalized_query)
+        if len(_query_lru) > _QUERY_LRU_MAXSIZE:
+            _query_lru.popitem(last=False)
+    return embedding
+
+
+def get_query_embedding(text: str) -> List[float]:
+    """
+    Embedding for a search query, cached by normalized query text.
+    
+    Checks a per-process LRU first, then the shared Django cache, and only
+    calls OpenAI on a miss in both.
+    
+    Args:
+        text: Search query text
+        
+    Returns:
+        List of 1536 floats representing the embedding
+    """
+    if not text or not text.strip():
+        raise ValueError("Text cannot be empty")
+    normalized_query = _normalize_query(text)
+    embedding = _lru_get(normalized_query)
+    if embedding is None:
+        key = _query_cache_key(normalized_query)
+        cached = cache.get(key)
+        if cached is None:
+            _record_query_miss(normalized_query)
+            cached = EmbeddingService().generate_embedding(normalized_query)
+            cache.set(key, cached, QUERY_EMBEDDING_CACHE_TTL)
+        embedding = _lru_put(normalized_query, cached)
+    return list(embedding)
+
+
+async def aget_query_embedding(text: str) -> List[float]:
+    """Async variant of get_query_embedding using the pooled async HTTP client."""
+    if not text or not text.strip():
+        raise ValueError("Text cannot be empty")
+    normalized_query = _normalize_query(text)
+    embedding = _lru_get(normalized_query)
+    if embedding is None:
+        key = _query_cache_key(normalized_query)
+        cached = await cache.aget(key)
+        if cached is None:
+            await _arecord_query_miss(normalized_query)
+            cached = await EmbeddingService().agenerate_embedding(normalized_query)
+            await cache.aset(key, cached, QUERY_EMBEDDING_CACHE_TTL)
+        embedding = _lru_put(normalized_query, cached)
+    return list(embedding)
+
+
+def warm_query_embeddings(limit: int = 100) -> int:
+    """
+    Pre-compute embeddings for the most frequently missed search queries.
+    
+    Intended to run periodically (e.g. from cron via the
+    warm_query_embeddings management command) so hot queries are already in
+    the shared cache when requests arrive.
+    
+    Args:
+        limit: Number of most popular queries to consider
+        
+    Returns:
+        Number of embeddings generated
+    """
+    counts = cache.get(POPULAR_QUERIES_CACHE_KEY) or {}
+    popular = sorted(counts, key=counts.get, reverse=True)[:limit]
+    missing = [query for query in popular if cache.get(_query_cache_key(query)) is None]
+    if not missing:
+        return 0
+    
+    service = EmbeddingService()
+    generated = 0
+    for i in range(0, len(missing), service.max_batch_size):
+        batch = missing[i:i + service.max_batch_size]
+        for query, embedding in zip(batch, service.generate_batch_embeddings(batch)):
+            if embedding:
+                cache.set(_query_cache_key(query), embedding, QUERY_EMBEDDING_CACHE_TTL)
+                generated += 1
+    
+    logger.info(f"Pre-warmed {generated} query embeddings from {len(popular)} popular queries")
+    return generated
+
+
 def generate_embeddings_for_model(model_class, force_regenerate: bool = False, batch_size: int = 100):
     """
     Generate embeddings for all instances of a model class.
@@ -171,12 +398,15 @@ def generate_embeddings_for_model(model_class, force_regenerate: bool = False, b
     """
     service = EmbeddingService()
     
+    # Load relations used by get_embedding_text() up front to avoid N+1 fetches
+    queryset = model_class.objects.select_related(*getattr(model_class, 'EMBEDDING_SELECT_RELATED', ()))
+    
     # Get instances without embeddings (or all if force regenerating)
     if force_regenerate:
-        instances = list(model_class.objects.all())
+        instances = list(queryset.all())
         logger.info(f"Force regenerating embeddings for {len(instances)} {model_class.__name__} instances")
     else:
-        instances = list(model_class.objects.filter(embedding__isnull=True))
+        instances = list(queryset.filter(embedding__isnull=True))
         logger.info(f"Generating embeddings for {len(instances)} {model_class.__name__} instances without embeddings")
     
     if instances:
@@ -7,14 +7,26 @@ from typing import List, Dict, Tuple
 from asgiref.sync import sync_to_async
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Prefetch
 
 from .models import EvaluationSet, Evaluation
 from apps.profiles.models import Profile, ProfileSkill
 from apps.opportunities.models import Opportunity, OpportunitySkill
 
-# PostgreSQL vector similarity imports
-from pgvector.django import CosineDistance
-from django.db.models import Max, Case, When, F, Value, FloatField
+import numpy as np
+
+
+def _embedding_matrix(embeddings) -> np.ndarray:
+    """
+    Stack embeddings into a C-contiguous float32 (N, D) matrix of unit rows,
+    so cosine similarity against another such matrix is a plain matmul.
+    """
+    matrix = np.array([np.asarray(e, dtype=np.float32) for e in embeddings], dtype=np.float32)
+    if not len(matrix):
+        return matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
 
 
 class EvaluationService:
@@ -285,7 +297,7 @@ class EvaluationService:
     
     def _calculate_semantic_similarity(self, profile: Profile, opportunity: Opportunity) -> float:
         """
-        Calculate multi-dimensional semantic similarity using PostgreSQL vector operations.
+        Calculate multi-dimensional semantic similarity from stored embeddings.
         
         Implements sophisticated matching strategy:
         1. Skills-to-skills matching (ProfileSkill ↔ OpportunitySkill)
@@ -319,78 +331,46 @@ class EvaluationService:
         
         return min(1.0, max(0.0, final_similarity))  # Clamp to [0, 1]
     
-    def _ensure_list(self, embedding) -> List[float]:
-        """Convert numpy array to list for pgvector compatibility"""
-        if hasattr(embedding, 'tolist'):
-            return embedding.tolist()
-        elif isinstance(embedding, (list, tuple)):
-            return list(embedding)
-        else:
-            return list(embedding)
-    
     def _calculate_skills_similarity(self, profile: Profile, opportunity: Opportunity) -> float:
         """
-        Calculate semantic similarity between ProfileSkills and OpportunitySkills using PostgreSQL.
+        Calculate semantic similarity between ProfileSkills and OpportunitySkills.
+        
+        Both sides are loaded once as unit-normalized matrices, so every pairwise
+        cosine similarity comes from a single matrix product.
         
         NOTE: This is a SYNC method with Django ORM calls - use sync_to_async when calling from async context.
         """
+        opportunity_matrix = _embedding_matrix(
+            opportunity.opportunity_skills.exclude(embedding__isnull=True).values_list('embedding', flat=True)
+        )
+        profile_matrix = _embedding_matrix(
+            profile.profile_skills.exclude(embedding__isnull=True).values_list('embedding', flat=True)
+        )
         
-        profile_skills = profile.profile_skills.exclude(embedding__isnull=True)
-        opportunity_skills = opportunity.opportunity_skills.exclude(embedding__isnull=True)
-        
-        if not profile_skills.exists() or not opportunity_skills.exists():
+        if not len(opportunity_matrix) or not len(profile_matrix):
             return 0.0
         
-        # For each opportunity skill, find the most similar profile skill using pgvector
-        similarities = []
-        
-        for opp_skill in opportunity_skills:
-            # Convert numpy array to list for pgvector compatibility
-            opp_embedding = self._ensure_list(opp_skill.embedding)
-            
-            # Find the most similar profile skill using Django ORM + pgvector
-            best_match = profile_skills.annotate(
-                similarity=1 - CosineDistance('embedding', opp_embedding)
-            ).aggregate(
-                max_similarity=Max('similarity')
-            )['max_similarity']
-            
-            similarities.append(best_match or 0.0)
-        
-        # Return average of best matches for each opportunity skill
-        return sum(similarities) / len(similarities) if similarities else 0.0
+        # For each opportunity skill take the most similar profile skill, then average
+        return float((opportunity_matrix @ profile_matrix.T).max(axis=1).mean())
     
     def _calculate_experience_similarity(self, profile: Profile, opportunity: Opportunity) -> float:
         """
-        Calculate semantic similarity between ProfileExperiences and OpportunityExperiences using PostgreSQL.
+        Calculate semantic similarity between ProfileExperiences and OpportunityExperiences.
         
         NOTE: This is a SYNC method with Django ORM calls - use sync_to_async when calling from async context.
         """
+        opportunity_matrix = _embedding_matrix(
+            opportunity.opportunity_experiences.exclude(embedding__isnull=True).values_list('embedding', flat=True)
+        )
+        profile_matrix = _embedding_matrix(
+            profile.profile_experiences.exclude(embedding__isnull=True).values_list('embedding', flat=True)
+        )
         
-        profile_experiences = profile.profile_experiences.exclude(embedding__isnull=True)
-        opportunity_experiences = opportunity.opportunity_experiences.exclude(embedding__isnull=True)
-        
-        if not profile_experiences.exists() or not opportunity_experiences.exists():
+        if not len(opportunity_matrix) or not len(profile_matrix):
             return 0.0
         
-        # For each opportunity experience, find the most similar profile experience using pgvector
-        similarities = []
-        
-        for opp_exp in opportunity_experiences:
-            # Convert numpy array to list for pgvector compatibility
-            opp_embedding = self._ensure_list(opp_exp.embedding)
-            
-            # Find the most similar profile experience using Django ORM + pgvector
-            best_match = profile_experiences.annotate(
-                similarity=1 - CosineDistance('embedding', opp_embedding)
-            ).aggregate(
-                max_similarity=Max('similarity')
-            )['max_similarity']
-            
-            similarities.append(best_match or 0.0)
-        
-        # Return average of best matches for each opportunity experience
-        return sum(similarities) / len(similarities) if similarities else 0.0
+        # For each opportunity experience take the most similar profile experience, then average
+        return float((opportunity_matrix @ profile_matrix.T).max(axis=1).mean())
 
     def _get_filtered_evaluations(self, eval_set: EvaluationSet, limit: int = None, applied_filter: str = None):
         """
@@ -426,60 +406,39 @@ class EvaluationService:
     def _calculate_contextual_skills_similarity(self, profile: Profile, opportunity: Opportunity) -> float:
         """
         Calculate semantic similarity between ProfileExperienceSkills and OpportunitySkills
-        with temporal weighting using PostgreSQL. This is the key innovation - skills demonstrated 
+        with temporal weighting. This is the key innovation - skills demonstrated 
         in context with recency bias.
         
         NOTE: This is a SYNC method with Django ORM calls - use sync_to_async when calling from async context.
         """
         from apps.profiles.models import ProfileExperienceSkill
         
-        opportunity_skills = opportunity.opportunity_skills.exclude(embedding__isnull=True)
-        
-        if not opportunity_skills.exists():
+        opportunity_matrix = _embedding_matrix(
+            opportunity.opportunity_skills.exclude(embedding__isnull=True).values_list('embedding', flat=True)
+        )
+        if not len(opportunity_matrix):
             return 0.0
         
         # Get all ProfileExperienceSkills for this profile with embeddings
-        profile_exp_skills = ProfileExperienceSkill.objects.filter(
+        profile_exp_skills = list(ProfileExperienceSkill.objects.filter(
             profile_experience__profile=profile,
             embedding__isnull=False
-        ).select_related('profile_experience')
+        ).values_list('embedding', 'profile_experience__end_date'))
         
-        if not profile_exp_skills.exists():
+        if not profile_exp_skills:
             return 0.0
         
-        # For each opportunity skill, find best matching experience skill with temporal weighting
-        weighted_similarities = []
+        embeddings, end_dates = zip(*profile_exp_skills)
+        profile_matrix = _embedding_matrix(embeddings)
         
-        for opp_skill in opportunity_skills:
-            # Convert numpy array to list for pgvector compatibility
-            opp_embedding = self._ensure_list(opp_skill.embedding)
-            
-            # Annotate experience skills with similarity and temporal weight using Django ORM
-            annotated_exp_skills = profile_exp_skills.annotate(
-                # Calculate cosine similarity using pgvector
-                base_similarity=1 - CosineDistance('embedding', opp_embedding),
-                
-                # Simple temporal weight: current roles get 1.0, past roles get 0.7
-                # This avoids complex date arithmetic that causes ORM issues
-                temporal_weight=Case(
-                    When(profile_experience__end_date__isnull=True, then=Value(1.0)),  # Current role
-                    default=Value(0.7),  # Past role
-                    output_field=FloatField()
-                ),
-                
-                # Final weighted similarity
-                weighted_similarity=F('base_similarity') * F('temporal_weight')
-            )
-            
-            # Get the best weighted match for this opportunity skill
-            best_weighted_match = annotated_exp_skills.aggregate(
-                max_weighted=Max('weighted_similarity')
-            )['max_weighted']
-            
-            weighted_similarities.append(best_weighted_match or 0.0)
+        # Simple temporal weight: current roles get 1.0, past roles get 0.7
+        temporal_weights = np.array(
+            [1.0 if end_date is None else 0.7 for end_date in end_dates], dtype=np.float32
+        )
         
-        # Return average weighted similarity across all opportunity skills
-        return sum(weighted_similarities) / len(weighted_similarities) if weighted_similarities else 0.0
+        # Best weighted match per opportunity skill, averaged across opportunity skills
+        weighted_similarities = (opportunity_matrix @ profile_matrix.T) * temporal_weights
+        return float(weighted_similarities.max(axis=1).mean())
     
     def _llm_judge_evaluation(
         self, 
@@ -895,14 +854,18 @@ Respond in JSON format: {{"score": 0.85, "reasoning": "detailed analysis here"}}
             def get_target_opps_func(target_ids):
                 return list(Opportunity.objects.filter(
                     id__in=target_ids
-                ).select_related('organisation').prefetch_related('opportunity_skills__skill'))
+                ).select_related('organisation').prefetch_related(
+                    Prefetch('opportunity_skills', queryset=OpportunitySkill.objects.select_related('skill'))
+                ))
             
             get_target_opps = sync_to_async(get_target_opps_func)
             opportunities = await get_target_opps(target_opportunities)
         else:
             # Get all opportunities for general market analysis
             def get_all_opps_func():
-                return list(Opportunity.objects.select_related('organisation').prefetch_related('opportunity_skills__skill').all())
+                return list(Opportunity.objects.select_related('organisation').prefetch_related(
+                    Prefetch('opportunity_skills', queryset=OpportunitySkill.objects.select_related('skill'))
+                ).all())
             
             get_all_opps = sync_to_async(get_all_opps_func)
             opportunities = await get_all_opps()
@@ -1,15 +1,23 @@
 """
 Custom Mem0 storage backend using Django models with PostgreSQL + pgvector.
 """
+import asyncio
 import uuid
+import hashlib
 import logging
+import threading
 import time
-from typing import List, Dict, Any, Optional, Tuple
+from collections import deque
+from typing import List, Dict, Any, Deque, Optional, Set, Tuple
 from django.db import transaction
+from django.db.models import Count, Max, Subquery
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from .models import Memory, MemorySearch
+import httpx
 from openai import OpenAI
+from pgvector import HalfVector
+from pgvector.django import CosineDistance
 import numpy as np
 
 # Optional LangSmith tracing
@@ -24,6 +32,50 @@ except Exception:  # pragma: no cover
 # Set up logger for memory operations
 logger = logging.getLogger('apps.memories')
 
+# text-embedding-3-small truncated to 512 dimensions (stored in Memory.embedding_v2)
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 512
+
+# Per-user embedding matrix cache shared across backend instances:
+# user_id -> (key, matrix, ids, rows). Matrix rows are unit-normalized so
+# cosine similarity is a plain dot product. The key fingerprints the user's
+# active memories so writes from other processes also invalidate it.
+_USER_MATRIX_CACHE: Dict[str, Tuple[str, np.ndarray, List[str], List[Dict[str, Any]]]] = {}
+_USER_MATRIX_LOCK = threading.Lock()
+
+# Strong references to fire-and-forget analytics tasks until they finish
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+
+_OPENAI_CLIENT: Optional[OpenAI] = None
+_OPENAI_CLIENT_LOCK = threading.Lock()
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return a process-wide OpenAI client.
+    
+    Backends are created per operation, so sharing one client (and its
+    keep-alive connection pool) avoids a fresh TCP+TLS handshake per call.
+    """
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        with _OPENAI_CLIENT_LOCK:
+            if _OPENAI_CLIENT is None:
+                _OPENAI_CLIENT = OpenAI(
+                    http_client=httpx.Client(
+                        timeout=10.0,
+                        limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+                    )
+                )
+    return _OPENAI_CLIENT
+
+
+def invalidate_user_matrix(user_id: str) -> None:
+    """Drop the cached embedding matrix for a user."""
+    with _USER_MATRIX_LOCK:
+        _USER_MATRIX_CACHE.pop(user_id, None)
+
 
 class DjangoMemoryBackend:
     """
@@ -33,13 +85,16 @@ class DjangoMemoryBackend:
     
     def __init__(self, config=None):
         self.config = config or {}
-        self.openai_client = OpenAI()
+        self.openai_client = get_openai_client()
         logger.info("Initialized DjangoMemoryBackend with config: %s", self.config)
-        # Simple per-user LRU of recent hashes to limit duplicates
-        self._recent_hashes: Dict[str, List[str]] = {}
+        # Simple per-user LRU of recent hashes to limit duplicates; the set
+        # mirrors the deque for O(1) membership checks
+        self._recent_hashes: Dict[str, Deque[str]] = {}
+        self._recent_hash_sets: Dict[str, Set[str]] = {}
+        self._recent_hashes_lock = threading.Lock()
         
     def _get_embedding(self, text: str) -> List[float]:
-        """Generate embedding using OpenAI's text-embedding-3-small"""
+        """Generate a 512-dimension embedding using OpenAI's text-embedding-3-small"""
         start_time = time.time()
         
         # Validate input
@@ -57,8 +112,9 @@ class DjangoMemoryBackend:
         
         try:
             response = self.openai_client.embeddings.create(
-                model="text-embedding-3-small",
-                input=text
+                model=EMBEDDING_MODEL,
+                input=text,
+                dimensions=EMBEDDING_DIMENSIONS
             )
             embedding = response.data[0].embedding
             duration = time.time() - start_time
@@ -126,7 +182,7 @@ class DjangoMemoryBackend:
                 memory = Memory.objects.create(
                     user_id=user_id,
                     content=content,
-                    embedding=embedding,
+                    embedding_v2=embedding,
                     memory_type=metadata.get('memory_type', 'factual'),
                     interaction_type=metadata.get('interaction_type', 'conversation'),
                     category=metadata.get('category', 'general'),
@@ -138,6 +194,8 @@ class DjangoMemoryBackend:
                     metadata=metadata
                 )
                 
+                invalidate_user_matrix(user_id)
+                
                 duration = time.time() - start_time
                 logger.info("Memory created successfully (ID: %s) in %.2fs", memory.id, duration)
                 
@@ -164,7 +222,102 @@ class DjangoMemoryBackend:
         Returns:
             Dict with results list
         """
-        return await sync_to_async(self._search_impl)(query, user_id, limit)
+        start_time = time.time()
+        result = await sync_to_async(self._search_impl)(query, user_id, limit)
+        if "error" not in result:
+            # Analytics are written off the critical path in a single insert
+            duration_ms = int((time.time() - start_time) * 1000)
+            task = asyncio.create_task(
+                sync_to_async(self._record_search)(user_id, query.strip(), len(result["results"]), duration_ms)
+            )
+            _BACKGROUND_TASKS.add(task)
+            task.add_done_callback(_BACKGROUND_TASKS.discard)
+        return result
+    
+    def _record_search(self, user_id: str, query: str, results_count: int, duration_ms: int) -> None:
+        """Persist a MemorySearch analytics row; failures are logged, never raised."""
+        try:
+            search_record = MemorySearch.objects.create(
+                user_id=user_id,
+                query=query,
+                results_count=results_count,
+                search_duration_ms=duration_ms,
+                search_type='semantic'
+            )
+            logger.debug("Created search record (ID: %s)", search_record.id)
+        except Exception as e:
+            logger.warning("Failed to record search for user_id %s: %s", user_id, str(e))
+    
+    def _get_user_matrix(self, user_id: str) -> Tuple[np.ndarray, List[str], List[Dict[str, Any]]]:
+        """
+        Return (unit-normalized matrix, ids, rows) for the user's active memories.
+        
+        The matrix is rebuilt only when the user's memory fingerprint
+        (latest created/updated timestamps and row count) changes.
+        """
+        memories = Memory.objects.filter(
+            user_id=user_id,
+            is_archived=False,
+            embedding_v2__isnull=False
+        )
+        stats = memories.aggregate(
+            latest_created=Max('created_at'),
+            latest_updated=Max('updated_at'),
+            total=Count('id')
+        )
+        key = hashlib.sha256(
+            f"{stats['latest_created']}:{stats['latest_updated']}:{stats['total']}".encode("utf-8")
+        ).hexdigest()
+        
+        with _USER_MATRIX_LOCK:
+            cached = _USER_MATRIX_CACHE.get(user_id)
+        if cached and cached[0] == key:
+            logger.debug("Reusing cached memory matrix for user_id: %s", user_id)
+            return cached[1:]
+        
+        ids: List[str] = []
+        rows: List[Dict[str, Any]] = []
+        vectors: List[np.ndarray] = []
+        # Stream rows through a server-side cursor so only one chunk of
+        # embedding blobs is resident while the matrix is assembled
+        for memory in memories.defer('embedding').order_by('-created_at').iterator(chunk_size=1000):
+            vector = memory.embedding_v2.to_numpy().astype(np.float32)
+            if vector.size == 0:
+                continue
+            if vectors and vector.shape != vectors[0].shape:
+                logger.debug("Skipping memory %s due to dimension mismatch (%d vs %d)", 
+                           memory.id, vector.shape[0], vectors[0].shape[0])
+                continue
+            ids.append(str(memory.id))
+            rows.append({
+                'content': memory.content,
+                'metadata': {
+                    'category': memory.category,
+                    'subcategory': memory.subcategory,
+                    'memory_type': memory.memory_type,
+                    'importance': memory.importance,
+                    'created_at': memory.created_at.isoformat(),
+                },
+                'extra': memory.metadata or {},
+            })
+            vectors.append(vector)
+        
+        matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) if vectors else np.empty(0, dtype=np.float32)
+        
+        # Zero-norm vectors can never match; drop them up front
+        if vectors and not norms.all():
+            keep = np.flatnonzero(norms)
+            matrix, norms = matrix[keep], norms[keep]
+            ids = [ids[i] for i in keep]
+            rows = [rows[i] for i in keep]
+        if vectors:
+            matrix = np.ascontiguousarray(matrix / norms[:, None], dtype=np.float32)
+        
+        with _USER_MATRIX_LOCK:
+            _USER_MATRIX_CACHE[user_id] = (key, matrix, ids, rows)
+        logger.debug("Built memory matrix for user_id: %s (%d vectors)", user_id, len(ids))
+        return matrix, ids, rows
     
     def _search_impl(self, query: str, user_id: str, limit: int = 5) -> Dict:
         """Internal implementation of search method."""
@@ -192,89 +345,50 @@ class DjangoMemoryBackend:
             embedding_duration = time.time() - embedding_start
             logger.debug("Query embedding generated in %.2fs", embedding_duration)
             
-            # Track the search
-            search_record = MemorySearch.objects.create(
-                user_id=user_id,
-                query=query,
-                query_embedding=query_embedding,
-                search_type='semantic'
-            )
-            logger.debug("Created search record (ID: %s)", search_record.id)
-            
-            # Convert to numpy array for distance calculation
-            query_vector = np.array(query_embedding)
-            
-            # Get user memories with embeddings
+            # Load (or reuse) the user's cached embedding matrix
             memory_query_start = time.time()
-            memories = Memory.objects.filter(
-                user_id=user_id,
-                is_archived=False,
-                embedding__isnull=False
-            ).order_by('-created_at')
-            
-            memory_count = memories.count()
+            matrix, ids, rows = self._get_user_matrix(user_id)
+            memory_count = len(ids)
             memory_query_duration = time.time() - memory_query_start
-            logger.debug("Retrieved %d memories in %.2fs", memory_count, memory_query_duration)
+            logger.debug("Loaded %d memory vectors in %.2fs", memory_count, memory_query_duration)
             
             # Calculate similarities
             similarity_start = time.time()
             results = []
-            similarities_calculated = 0
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_norm = float(np.linalg.norm(query_vector))
             
-            for memory in memories:
-                if memory.embedding is not None and len(memory.embedding) > 0:
-                    try:
-                        memory_vector = np.array(memory.embedding)
-                        
-                        # Ensure vectors are same length
-                        if len(query_vector) != len(memory_vector):
-                            logger.debug("Skipping memory %s due to dimension mismatch (%d vs %d)", 
-                                       memory.id, len(query_vector), len(memory_vector))
-                            continue
-                            
-                        # Cosine similarity
-                        dot_product = np.dot(query_vector, memory_vector)
-                        query_norm = np.linalg.norm(query_vector)
-                        memory_norm = np.linalg.norm(memory_vector)
-                        
-                        if query_norm == 0 or memory_norm == 0:
-                            logger.debug("Skipping memory %s due to zero norm", memory.id)
-                            continue
-                            
-                        similarity = dot_product / (query_norm * memory_norm)
-                        similarities_calculated += 1
-                        
-                        # Include results with reasonable similarity (0.3+ for semantic relevance)
-                        if similarity > 0.3:
-                            results.append({
-                                'memory_id': str(memory.id),
-                                'memory': memory.content,
-                                'metadata': {
-                                    'category': memory.category,
-                                    'subcategory': memory.subcategory,
-                                    'memory_type': memory.memory_type,
-                                    'importance': memory.importance,
-                                    'created_at': memory.created_at.isoformat(),
-                                    'similarity': float(similarity),
-                                    **memory.metadata
-                                }
-                            })
-                            logger.debug("Found relevant memory (ID: %s, similarity: %.3f): %s", 
-                                       memory.id, similarity, memory.content[:100])
-                    except Exception as e:
-                        logger.warning("Error calculating similarity for memory %s: %s", memory.id, str(e))
-                        continue
+            if memory_count and query_norm != 0 and query_vector.shape[0] == matrix.shape[1]:
+                # Rows are unit-normalized, so cosine similarity is one matrix-vector product
+                similarities = matrix @ (query_vector / query_norm)
+                
+                # Include results with reasonable similarity (0.3+ for semantic relevance),
+                # keeping only the top `limit` candidates instead of sorting them all
+                candidates = np.flatnonzero(similarities > 0.3)
+                if len(candidates) > limit > 0:
+                    top = np.argpartition(similarities[candidates], -limit)[-limit:]
+                    candidates = candidates[top]
+                candidates = candidates[np.argsort(similarities[candidates])[::-1]][:limit]
+                
+                for idx in candidates:
+                    similarity = float(similarities[idx])
+                    row = rows[idx]
+                    metadata = {**row['metadata'], 'similarity': similarity}
+                    if row['extra']:
+                        metadata.update(row['extra'])
+                    results.append({
+                        'memory_id': ids[idx],
+                        'memory': row['content'],
+                        'metadata': metadata
+                    })
+                    logger.debug("Found relevant memory (ID: %s, similarity: %.3f): %s", 
+                               ids[idx], similarity, row['content'][:100])
+            elif memory_count and query_vector.shape[0] != matrix.shape[1]:
+                logger.debug("Skipping search due to dimension mismatch (%d vs %d)", 
+                           query_vector.shape[0], matrix.shape[1])
             
             similarity_duration = time.time() - similarity_start
-            logger.debug("Calculated %d similarities in %.2fs", similarities_calculated, similarity_duration)
-            
-            # Sort by similarity and limit results
-            results.sort(key=lambda x: x['metadata']['similarity'], reverse=True)
-            results = results[:limit]
-            
-            # Update search record with results count
-            search_record.results_count = len(results)
-            search_record.save()
+            logger.debug("Calculated %d similarities in %.2fs", memory_count, similarity_duration)
             
             duration = time.time() - start_time
             logger.info("Search completed in %.2fs: found %d relevant memories from %d total", 
@@ -296,18 +410,24 @@ class DjangoMemoryBackend:
         return " ".join(text.lower().strip().split())
 
     def _hash_text(self, text: str) -> str:
-        import hashlib
         return hashlib.sha256(self._normalize_text(text).encode("utf-8")).hexdigest()
 
     def recent_lru_check(self, user_id: str, text_hash: str, max_keep: int = 32) -> bool:
         """Return True if hash was seen recently; otherwise add and return False."""
-        bucket = self._recent_hashes.setdefault(user_id, [])
-        if text_hash in bucket:
-            return True
-        bucket.append(text_hash)
-        if len(bucket) > max_keep:
-            del bucket[0: len(bucket) - max_keep]
-        return False
+        with self._recent_hashes_lock:
+            bucket = self._recent_hashes.get(user_id)
+            if bucket is None or bucket.maxlen != max_keep:
+                bucket = deque(bucket or (), maxlen=max_keep)
+                self._recent_hashes[user_id] = bucket
+                self._recent_hash_sets[user_id] = set(bucket)
+            seen = self._recent_hash_sets[user_id]
+            if text_hash in seen:
+                return True
+            if len(bucket) == max_keep:
+                seen.discard(bucket[0])
+            bucket.append(text_hash)
+            seen.add(text_hash)
+            return False
 
     async def is_near_duplicate(self, user_id: str, text: str, threshold: float = 0.9, recent_n: int = 20) -> Tuple[bool, float]:
         """Vector near-duplicate check against user's recent memories.
@@ -322,25 +442,22 @@ class DjangoMemoryBackend:
             emb = self._get_embedding(text)
             if not emb:
                 return False, 0.0
-            q = np.array(emb)
-            memories = (
-                Memory.objects.filter(user_id=user_id, embedding__isnull=False, is_archived=False)
-                .order_by("-created_at")[:recent_n]
+            recent_ids = (
+                Memory.objects.filter(user_id=user_id, embedding_v2__isnull=False, is_archived=False)
+                .order_by("-created_at")
+                .values("id")[:recent_n]
+            )
+            # Let Postgres pick the nearest neighbour among the recent rows
+            distance = (
+                Memory.objects.filter(id__in=Subquery(recent_ids))
+                .annotate(distance=CosineDistance("embedding_v2", HalfVector(emb)))
+                .order_by("distance")
+                .values_list("distance", flat=True)
+                .first()
             )
-            max_sim = 0.0
-            for m in memories:
-                try:
-                    v = np.array(m.embedding)
-                    dot = float(np.dot(q, v))
-                    qn = float(np.linalg.norm(q)) or 1.0
-                    vn = float(np.linalg.norm(v)) or 1.0
-                    sim = dot / (qn * vn)
-                    if sim > max_sim:
-                        max_sim = sim
-                        if max_sim >= threshold:
-                            return True, max_sim
-                except Exception:
-                    continue
+            if distance is None:
+                return False, 0.0
+            max_sim = max(0.0, 1.0 - float(distance))
             return max_sim >= threshold, max_sim
         except Exception:
             return False, 0.0
@@ -374,17 +491,19 @@ class DjangoMemoryBackend:
             
             results = []
             for memory in memories:
+                metadata = {
+                    'category': memory.category,
+                    'subcategory': memory.subcategory,
+                    'memory_type': memory.memory_type,
+                    'importance': memory.importance,
+                    'created_at': memory.created_at.isoformat(),
+                }
+                if memory.metadata:
+                    metadata.update(memory.metadata)
                 results.append({
                     'memory_id': str(memory.id),
                     'memory': memory.content,
-                    'metadata': {
-                        'category': memory.category,
-                        'subcategory': memory.subcategory,
-                        'memory_type': memory.memory_type,
-                        'importance': memory.importance,
-                        'created_at': memory.created_at.isoformat(),
-                        **memory.metadata
-                    }
+                    'metadata': metadata
                 })
             
             duration = time.time() - start_time
@@ -410,19 +529,33 @@ class DjangoMemoryBackend:
             memory = Memory.objects.get(id=memory_id)
             logger.debug("Found memory to update: %s", memory.content[:100])
             
-            if 'content' in data:
+            changed_fields = []
+            
+            if 'content' in data and data['content'] != memory.content:
                 old_content = memory.content
+                # Only re-embed when the normalized text actually differs
+                if self._hash_text(data['content']) != self._hash_text(old_content):
+                    memory.embedding_v2 = self._get_embedding(data['content'])
+                    changed_fields.append('embedding_v2')
+                    logger.info("Updated memory content and regenerated embedding")
+                else:
+                    logger.info("Updated memory content (embedding unchanged)")
                 memory.content = data['content']
-                memory.embedding = self._get_embedding(data['content'])
-                logger.info("Updated memory content and regenerated embedding")
+                changed_fields.append('content')
                 logger.debug("Old content: %s", old_content[:100])
                 logger.debug("New content: %s", data['content'][:100])
             
             if 'metadata' in data:
-                old_metadata = memory.metadata.copy()
+                # The copy only exists for the debug log, so skip it otherwise
+                old_metadata = memory.metadata.copy() if logger.isEnabledFor(logging.DEBUG) else None
                 memory.metadata.update(data['metadata'])
-                memory.save()
-                logger.debug("Updated metadata from %s to %s", old_metadata, memory.metadata)
+                changed_fields.append('metadata')
+                if old_metadata is not None:
+                    logger.debug("Updated metadata from %s to %s", old_metadata, memory.metadata)
+            
+            if changed_fields:
+                memory.save(update_fields=changed_fields + ['updated_at'])
+                invalidate_user_matrix(memory.user_id)
             
             duration = time.time() - start_time
             logger.info("Memory updated successfully in %.2fs", duration)
@@ -453,6 +586,7 @@ class DjangoMemoryBackend:
             
             memory.is_archived = True
             memory.save()
+            invalidate_user_matrix(memory.user_id)
             
             duration = time.time() - start_time
             logger.info("Memory archived successfully in %.2fs", duration)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('memories', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='memory',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['user_id', '-created_at'], name='mem_user_cr_active'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='memory',
+            name='memories_me_user_id_2809a2_idx',
+        ),
+        migrations.AlterField(
+            model_name='memory',
+            name='is_archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:30
+
+import pgvector.django.halfvec
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memories', '0002_memory_active_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='memory',
+            name='embedding_v2',
+            field=pgvector.django.halfvec.HalfVectorField(blank=True, dimensions=512, null=True),
+        ),
+        # text-embedding-3 vectors are Matryoshka-trained: the first 512 components,
+        # re-normalized, match what the API returns for dimensions=512, so existing
+        # rows can be backfilled without re-embedding.
+        migrations.RunSQL(
+            sql=(
+                "UPDATE memories_memory "
+                "SET embedding_v2 = l2_normalize(subvector(embedding, 1, 512))::halfvec(512) "
+                "WHERE embedding IS NOT NULL AND embedding_v2 IS NULL;"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
 import uuid
-from pgvector.django import VectorField
+from pgvector.django import HalfVectorField, VectorField
 
 
 class Memory(models.Model):
@@ -15,9 +15,13 @@ class Memory(models.Model):
     user_id = models.CharField(max_length=255, db_index=True)
     content = models.TextField(help_text="The actual memory content/text")
     
-    # Vector embedding for semantic search (1536 dimensions for text-embedding-3-small)
+    # Legacy full-size embedding (1536 dimensions); superseded by embedding_v2
     embedding = VectorField(dimensions=1536, null=True, blank=True)
     
+    # Vector embedding for semantic search: text-embedding-3-small truncated to
+    # 512 dimensions (Matryoshka) and stored as half precision
+    embedding_v2 = HalfVectorField(dimensions=512, null=True, blank=True)
+    
     # Mem0 memory type classification (from Mem0 documentation)
     memory_type = models.CharField(
         max_length=20,
@@ -74,7 +78,7 @@ class Memory(models.Model):
     
     # Generic flags
     requires_followup = models.BooleanField(default=False, db_index=True)
-    is_archived = models.BooleanField(default=False, db_index=True)
+    is_archived = models.BooleanField(default=False)
     
     # Flexible metadata for domain-specific data
     metadata = models.JSONField(
@@ -92,7 +96,12 @@ class Memory(models.Model):
         indexes = [
             models.Index(fields=['user_id', 'memory_type']),
             models.Index(fields=['user_id', 'category']),
-            models.Index(fields=['user_id', 'created_at']),
+            # Hot path for search/get_all/dedup: active memories, newest first
+            models.Index(
+                fields=['user_id', '-created_at'],
+                name='mem_user_cr_active',
+                condition=models.Q(is_archived=False),
+            ),
             models.Index(fields=['user_id', 'importance']),
             models.Index(fields=['session_id', 'created_at']),
             models.Index(fields=['category', 'subcategory']),
@@ -101,6 +110,18 @@ class Memory(models.Model):
     def __str__(self):
         return f"{self.user_id}: {self.content[:50]}..." if len(self.content) > 50 else f"{self.user_id}: {self.content}"
 
+    def generate_embedding(self):
+        """Generate and save embedding for this instance"""
+        from apps.embeddings.services import EmbeddingService
+        service = EmbeddingService()
+        self.embedding_v2 = service.generate_embedding(self.content, dimensions=512)
+        self.save(update_fields=['embedding_v2'])
+
+    def ensure_embedding(self):
+        """Generate embedding if it doesn't exist"""
+        if self.embedding_v2 is None:
+            self.generate_embedding()
+
 
 class MemoryRelation(models.Model):
     """
@@ -3,9 +3,22 @@ API endpoints for opportunities app using Django Ninja.
 """
 
 from ninja import Router, Schema
+from ninja.errors import HttpError
+from pydantic import TypeAdapter
+import base64
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
 from typing import List, Optional
-from django.db.models import Q, F, Value
+from asgiref.sync import sync_to_async
+from django.db.models import Case, Count, Q, F, FloatField, TextField, Value, When, Window
+from django.db.models.functions import Cast, Coalesce
+from django.http import HttpResponse
+from pgvector.django import HalfVector, MaxInnerProduct
+from apps.embeddings.services import aget_query_embedding
 from apps.opportunities.models import Opportunity, OpportunitySkill, OpportunityExperience
+from apps.organisations.models import Organisation
 
 # Create router for opportunities endpoints
 opportunities_router = Router()
@@ -45,29 +58,196 @@ class OpportunityCreateSchema(Schema):
 class PaginatedOpportunitiesResponse(Schema):
     """Paginated response for opportunities list."""
     results: List[OpportunitySchema]
-    page: int
+    # Both are None in cursor mode: pages have no number, and the total is
+    # only counted for the first cursor page
+    page: Optional[int]
     page_size: int
-    total: int
+    total: Optional[int]
     has_next: bool
+    next_cursor: Optional[str] = None
+    # Similarity-ranked searches stop counting past RANKED_TOTAL_CAP (or the
+    # end of the requested page); when set, total is a lower bound
+    total_capped: bool = False
+
+
+# Cached adapters: responses are dumped straight to JSON bytes by pydantic-core
+# instead of building Schema instances that Ninja re-validates and re-dumps.
+_OPPORTUNITY_ADAPTER = TypeAdapter(OpportunitySchema)
+_PAGE_ADAPTER = TypeAdapter(PaginatedOpportunitiesResponse)
+
+
+# Columns read for each serialized opportunity (embeddings are never emitted)
+_OPPORTUNITY_FIELDS = ('title', 'description', 'location', 'organisation__name')
+
+
+def _as_text(field: str) -> Cast:
+    """Cast a UUID column to text in SQL so rows need no str() per id."""
+    return Cast(field, output_field=TextField())
+
+
+def _opportunity_values(queryset, *extra):
+    """Flat rows for serialization: _OPPORTUNITY_FIELDS plus the id as text."""
+    return queryset.values(*_OPPORTUNITY_FIELDS, *extra, id_str=_as_text('id'))
+
+
+# Whether any opportunity has an embedding, cached per process as
+# (value, expires_at); semantic/hybrid search degrades to keyword without one
+EMBEDDINGS_PRESENT_TTL = 60
+_embeddings_present = None
+
+
+async def _has_embeddings() -> bool:
+    global _embeddings_present
+    if _embeddings_present is None or _embeddings_present[1] <= time.monotonic():
+        present = await Opportunity.objects.filter(embedding__isnull=False).aexists()
+        _embeddings_present = (present, time.monotonic() + EMBEDDINGS_PRESENT_TTL)
+    return _embeddings_present[0]
+
+
+def _encode_cursor(row) -> str:
+    """Opaque keyset cursor for the (created_at, id) of the last row on a page."""
+    raw = f"{row['created_at'].isoformat()}|{row['id_str']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    """Inverse of _encode_cursor; raises HttpError(400) for malformed cursors."""
+    try:
+        created_at, opportunity_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), uuid.UUID(opportunity_id)
+    except ValueError:
+        raise HttpError(400, "Invalid cursor")
+
+
+def _semantic_search(queryset, query_embedding):
+    """
+    Order by ascending negative inner product (embedding <#> query), the form
+    the HNSW index can serve. Stored and query embeddings are unit length, so
+    this equals cosine distance - 1 without per-row norms; similarity > 0.1 is
+    expressed as distance < -0.1. The query is sent as a halfvec to match the
+    column type.
+    """
+    return queryset.annotate(
+        distance=MaxInnerProduct('embedding', HalfVector(query_embedding))
+    ).filter(distance__lt=-0.1).order_by('distance')
+
+
+# Share of the hybrid score given to a keyword hit (the rest is cosine similarity)
+HYBRID_KEYWORD_WEIGHT = 0.5
+
+# Similarity-ranked searches count their total up to this many matches, or to
+# one past the requested page if that is further; a total that reaches the
+# limit is reported as a lower bound (total_capped)
+RANKED_TOTAL_CAP = 1000
+
+
+def _keyword_match(q: str) -> Q:
+    return Q(title__icontains=q) | Q(description__icontains=q)
+
+
+def _hybrid_search(queryset, query_embedding, q: str):
+    """
+    Rank semantic and keyword matches together in one query: candidates are
+    rows within the semantic threshold or matching the keywords, scored as
+    weight * keyword_hit + (1 - weight) * cosine similarity (rows without an
+    embedding score on the keyword hit alone).
+    """
+    keyword = _keyword_match(q)
+    return queryset.annotate(
+        distance=MaxInnerProduct('embedding', HalfVector(query_embedding)),
+        keyword_score=Case(When(keyword, then=Value(1.0)), default=Value(0.0), output_field=FloatField()),
+    ).annotate(
+        score=(
+            Value(HYBRID_KEYWORD_WEIGHT) * F('keyword_score')
+            - Value(1 - HYBRID_KEYWORD_WEIGHT) * Coalesce(F('distance'), Value(0.0))
+        )
+    ).filter(Q(distance__lt=-0.1) | keyword).order_by('-score', '-created_at')
+
+
+async def _opportunity_rows_to_schemas(rows) -> List[OpportunitySchema]:
+    """
+    Build OpportunitySchemas from `_opportunity_values()` rows.
+
+    Skills and experiences are fetched as flat dict rows in one query each
+    and grouped by opportunity, so no model instances are hydrated. Values
+    come straight from the DB, so model_construct skips validation.
+    """
+    if not rows:
+        return []
+    ids = [row['id_str'] for row in rows]
+
+    skills_by_opportunity = defaultdict(list)
+    async for skill in OpportunitySkill.objects.filter(opportunity_id__in=ids).values(
+        'requirement_type', 'skill__name',
+        id_str=_as_text('id'), opportunity_id_str=_as_text('opportunity_id')
+    ):
+        skills_by_opportunity[skill['opportunity_id_str']].append(OpportunitySkillSchema.model_construct(
+            id=skill['id_str'],
+            skill_name=skill['skill__name'],
+            requirement_type=skill['requirement_type']
+        ))
+
+    experiences_by_opportunity = defaultdict(list)
+    async for exp in OpportunityExperience.objects.filter(opportunity_id__in=ids).values(
+        'description',
+        id_str=_as_text('id'), opportunity_id_str=_as_text('opportunity_id')
+    ):
+        experiences_by_opportunity[exp['opportunity_id_str']].append(OpportunityExperienceSchema.model_construct(
+            id=exp['id_str'],
+            description=exp['description']
+        ))
+
+    return [
+        OpportunitySchema.model_construct(
+            id=row['id_str'],
+            title=row['title'],
+            description=row['description'],
+            location=row['location'],
+            organisation_name=row['organisation__name'],
+            skills=skills_by_opportunity[row['id_str']],
+            experiences=experiences_by_opportunity[row['id_str']]
+        )
+        for row in rows
+    ]
+
+
+def _json_response(adapter: TypeAdapter, payload: Schema) -> HttpResponse:
+    """Dump a response schema to JSON bytes, bypassing Ninja's renderer."""
+    return HttpResponse(adapter.dump_json(payload), content_type="application/json")
 
 
 @opportunities_router.get("/", response=PaginatedOpportunitiesResponse, tags=["Opportunities"])
-def list_opportunities(
+async def list_opportunities(
     request,
     q: Optional[str] = None,
     organisation: Optional[str] = None,
     location: Optional[str] = None,
     mode: str = "hybrid",
     page: int = 1,
-    page_size: int = 20
+    page_size: int = 20,
+    cursor: Optional[str] = None
 ):
-    """List opportunities with search, filters, and pagination."""
-    from apps.embeddings.services import EmbeddingService
+    """
+    List opportunities with search, filters, and pagination.
+
+    Pages are OFFSET-based by default. Passing ``cursor`` (empty for the first
+    page, then each response's ``next_cursor``) switches to keyset pagination
+    on (created_at, id), whose cost does not grow with page depth; ``page`` is
+    then ignored and ``total`` is only counted for the first page. Cursors are
+    ignored for similarity-ranked (semantic/hybrid) searches.
+    """
+    # Nothing to compare against: skip embedding the query and search by keyword
+    if q and mode in ("semantic", "hybrid") and not await _has_embeddings():
+        mode = "keyword"
+
+    # Embed the query up front over the pooled async HTTP client; building
+    # the queryset is lazy
+    query_embedding = None
+    if q and mode in ("semantic", "hybrid"):
+        query_embedding = await aget_query_embedding(q)
 
     def build_queryset():
-        queryset = Opportunity.objects.prefetch_related(
-            'organisation', 'opportunity_skills__skill', 'opportunity_experiences'
-        )
+        queryset = Opportunity.objects.all()
 
         # Apply filters
         if organisation:
@@ -79,121 +259,130 @@ def list_opportunities(
         if q:
             if mode == "keyword":
                 # Keyword search using ILIKE
-                queryset = queryset.filter(
-                    Q(title__icontains=q) | Q(description__icontains=q)
-                )
+                queryset = queryset.filter(_keyword_match(q))
             elif mode == "semantic" and hasattr(Opportunity, 'embedding'):
                 # Semantic search using embeddings
-                from pgvector.django import CosineDistance
-
-                service = EmbeddingService()
-                query_embedding = service.generate_embedding(q)
-
-                queryset = queryset.annotate(
-                    similarity=1 - CosineDistance('embedding', query_embedding)
-                ).filter(similarity__gt=0.1).order_by('-similarity')
+                queryset = _semantic_search(queryset, query_embedding)
             elif mode == "hybrid" and hasattr(Opportunity, 'embedding'):
-                # Hybrid search: try semantic first, fallback to keyword
-                from pgvector.django import CosineDistance
-
-                service = EmbeddingService()
-                query_embedding = service.generate_embedding(q)
-
-                # First try semantic search
-                semantic_results = queryset.annotate(
-                    similarity=1 - CosineDistance('embedding', query_embedding)
-                ).filter(similarity__gt=0.1).order_by('-similarity')
-
-                # If no semantic results, fallback to keyword
-                if not semantic_results.exists():
-                    return queryset.filter(
-                        Q(title__icontains=q) | Q(description__icontains=q)
-                    )
-                else:
-                    return semantic_results
+                # Hybrid search: keyword hits and cosine similarity fused into
+                # one score, so keyword-only matches still rank when no
+                # embeddings are close
+                queryset = _hybrid_search(queryset, query_embedding, q)
             else:
                 # Fallback to keyword if mode is invalid or embeddings missing
-                queryset = queryset.filter(
-                    Q(title__icontains=q) | Q(description__icontains=q)
-                )
+                queryset = queryset.filter(_keyword_match(q))
 
         return queryset
 
-    def paginate_and_serialize(queryset, page, page_size):
+    ranked = bool(q) and mode in ("semantic", "hybrid")
+
+    async def fetch_ranked_page(queryset, start, end):
+        # A window total would read every match before LIMIT applies, so an
+        # ORDER BY distance LIMIT n page could never stop the HNSW scan early.
+        # The page is read on its own, one row past its end to learn whether
+        # another page follows; the total is counted only when the page
+        # doesn't settle it, and then only up to a limit.
+        rows = [row async for row in _opportunity_values(queryset)[start:end + 1]]
+        has_next = len(rows) > end - start
+        rows = rows[:end - start]
+        if not has_next and (rows or not start):
+            return rows, start + len(rows), False, False
+        limit = max(RANKED_TOTAL_CAP, end + 1)
+        total = await queryset.values('pk')[:limit].acount()
+        return rows, total, has_next, total >= limit
+
+    async def fetch_page(queryset, start, end):
+        # Returns (rows, total, has_next, total_capped)
+        if ranked:
+            return await fetch_ranked_page(queryset, start, end)
+
+        # The total rides along on each row as a window count so the page
+        # and its total come back in one query
+        rows = [
+            row async for row in _opportunity_values(
+                queryset.annotate(total_count=Window(expression=Count('*'))), 'total_count'
+            )[start:end]
+        ]
+        if rows:
+            total = rows[0]['total_count']
+        else:
+            # Past the last page (or no matches): nothing to read the total from
+            total = await queryset.acount() if start else 0
+        return rows, total, total > end, False
+
+    async def paginate_and_serialize(queryset, page, page_size):
         # Calculate pagination
-        total = queryset.count()
         start = (page - 1) * page_size
         end = start + page_size
 
-        opportunities = list(queryset[start:end])
-
-        # Serialize results
-        results = []
-        for opp in opportunities:
-            results.append(OpportunitySchema(
-                id=str(opp.id),
-                title=opp.title,
-                description=opp.description,
-                location=opp.location,
-                organisation_name=opp.organisation.name,
-                skills=[
-                    OpportunitySkillSchema(
-                        id=str(skill.id),
-                        skill_name=skill.skill.name,
-                        requirement_type=skill.requirement_type
-                    )
-                    for skill in opp.opportunity_skills.all()
-                ],
-                experiences=[
-                    OpportunityExperienceSchema(
-                        id=str(exp.id),
-                        description=exp.description
-                    )
-                    for exp in opp.opportunity_experiences.all()
-                ]
-            ))
-
-        return PaginatedOpportunitiesResponse(
-            results=results,
+        rows, total, has_next, total_capped = await fetch_page(queryset, start, end)
+
+        return _json_response(_PAGE_ADAPTER, PaginatedOpportunitiesResponse.model_construct(
+            results=await _opportunity_rows_to_schemas(rows),
             page=page,
             page_size=page_size,
             total=total,
-            has_next=total > page * page_size
-        )
+            has_next=has_next,
+            total_capped=total_capped
+        ))
+
+    async def paginate_by_cursor(queryset, cursor, page_size):
+        # Counting every match would cost as much on each page as an OFFSET
+        # scan, so only the first page carries a total
+        total = None if cursor else await queryset.acount()
+        queryset = queryset.order_by('-created_at', '-id')
+        if cursor:
+            created_at, opportunity_id = _decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=opportunity_id)
+            )
+
+        # Read one row past the page to learn whether another page follows
+        rows = [row async for row in _opportunity_values(queryset, 'created_at')[:page_size + 1]]
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        return _json_response(_PAGE_ADAPTER, PaginatedOpportunitiesResponse.model_construct(
+            results=await _opportunity_rows_to_schemas(rows),
+            page=None,
+            page_size=page_size,
+            total=total,
+            has_next=has_next,
+            next_cursor=_encode_cursor(rows[-1]) if has_next else None
+        ))
 
     queryset = build_queryset()
-    response = paginate_and_serialize(queryset, page, page_size)
+    if cursor is not None and not ranked:
+        return await paginate_by_cursor(queryset, cursor, page_size)
+    response = await paginate_and_serialize(queryset, page, page_size)
     return response
 
 
 @opportunities_router.post("/", response=OpportunitySchema, tags=["Opportunities"])
 async def create_opportunity(request, payload: OpportunityCreateSchema):
     """Create a new opportunity."""
-    from asgiref.sync import sync_to_async
-    from apps.organisations.models import Organisation
 
-    organisation = await sync_to_async(Organisation.objects.get)(id=payload.organisation_id)
+    organisation = await Organisation.objects.aget(id=payload.organisation_id)
 
-    opportunity = await sync_to_async(Opportunity.objects.create)(
+    opportunity = await Opportunity.objects.acreate(
         title=payload.title,
         description=payload.description,
         organisation=organisation
     )
-    return OpportunitySchema(
+    return _json_response(_OPPORTUNITY_ADAPTER, OpportunitySchema.model_construct(
         id=str(opportunity.id),
         title=opportunity.title,
         description=opportunity.description,
-        organisation_name=opportunity.organisation.name,
+        location=opportunity.location,
+        organisation_name=organisation.name,
         skills=[],
         experiences=[]
-    )
+    ))
 
 
 @opportunities_router.get("/{opportunity_id}/questions", response=List[dict], tags=["Opportunities"])
 async def get_opportunity_questions(request, opportunity_id: str):
     """Get screening questions for an opportunity."""
-    from asgiref.sync import sync_to_async
-
     @sync_to_async
     def get_questions_sync():
         try:
@@ -223,27 +412,6 @@ async def get_opportunity_questions(request, opportunity_id: str):
 @opportunities_router.get("/{opportunity_id}", response=OpportunitySchema, tags=["Opportunities"])
 async def get_opportunity(request, opportunity_id: str):
     """Get a specific opportunity by ID."""
-    from asgiref.sync import sync_to_async
-
-    opportunity = await sync_to_async(Opportunity.objects.prefetch_related('organisation', 'opportunity_skills__skill', 'opportunity_experiences').get)(id=opportunity_id)
-    return OpportunitySchema(
-        id=str(opportunity.id),
-        title=opportunity.title,
-        description=opportunity.description,
-        organisation_name=opportunity.organisation.name,
-        skills=[
-            OpportunitySkillSchema(
-                id=str(skill.id),
-                skill_name=skill.skill.name,
-                requirement_type=skill.requirement_type
-            )
-            for skill in opportunity.opportunity_skills.all()
-        ],
-        experiences=[
-            OpportunityExperienceSchema(
-                id=str(exp.id),
-                description=exp.description
-            )
-            for exp in opportunity.opportunity_experiences.all()
-        ]
-    )
+    row = await _opportunity_values(Opportunity.objects.all()).aget(id=opportunity_id)
+    opportunity, = await _opportunity_rows_to_schemas([row])
+    return _json_response(_OPPORTUNITY_ADAPTER, opportunity)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0005_opportunity_location_and_more'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "DROP INDEX IF EXISTS opportunity_embedding_idx;",
+                "CREATE INDEX opp_embedding_hnsw ON opportunities_opportunity USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS opp_embedding_hnsw;",
+                "CREATE INDEX opportunity_embedding_idx ON opportunities_opportunity USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);",
+            ],
+        ),
+    ]
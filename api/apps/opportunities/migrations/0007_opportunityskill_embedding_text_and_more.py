@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0006_opportunity_embedding_hnsw'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='opportunityskill',
+            name='embedding_text',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='opportunityexperience',
+            name='embedding_text',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 11:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0007_opportunityskill_embedding_text_and_more'),
+        ('organisations', '0007_organisation_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'), name='opp_location_trgm'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:00
+
+import pgvector.django.halfvec
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0010_opportunity_created_id_idx'),
+    ]
+
+    operations = [
+        # The HNSW index is bound to the vector opclass; rebuild it around the type change
+        migrations.RunSQL(
+            sql="DROP INDEX IF EXISTS opp_embedding_hnsw;",
+            reverse_sql="CREATE INDEX opp_embedding_hnsw ON opportunities_opportunity USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);",
+        ),
+        migrations.AlterField(
+            model_name='opportunity',
+            name='embedding',
+            field=pgvector.django.halfvec.HalfVectorField(blank=True, dimensions=1536, null=True),
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX opp_embedding_hnsw ON opportunities_opportunity USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);",
+            reverse_sql="DROP INDEX IF EXISTS opp_embedding_hnsw;",
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('opportunities', '0011_opportunity_embedding_halfvec'),
+    ]
+
+    operations = [
+        # Stored embeddings are unit length, so search ranks by inner product
+        migrations.RunSQL(
+            sql=[
+                "UPDATE opportunities_opportunity SET embedding = l2_normalize(embedding) WHERE embedding IS NOT NULL;",
+                "DROP INDEX IF EXISTS opp_embedding_hnsw;",
+                "CREATE INDEX opp_embedding_hnsw ON opportunities_opportunity USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64);",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS opp_embedding_hnsw;",
+                "CREATE INDEX opp_embedding_hnsw ON opportunities_opportunity USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);",
+            ],
+        ),
+    ]
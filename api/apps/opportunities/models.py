@@ -1,10 +1,37 @@
-from django.db import models
-from pgvector.django import VectorField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models.functions import Upper
+from pgvector.django import HalfVectorField, VectorField
 from apps.organisations.models import Organisation
 from apps.skills.models import Skill
 import uuid
 
 
+# Opportunity fields quoted in OpportunitySkill/OpportunityExperience embedding text
+EMBEDDING_TEXT_SOURCE_FIELDS = {'title', 'description', 'organisation', 'organisation_id'}
+
+
+class EmbeddingQuerySet(models.QuerySet):
+    """QuerySet for models with an `embedding` column and get_embedding_text()."""
+
+    def bulk_ensure_embeddings(self, batch_size: int = 100) -> int:
+        """
+        Generate embeddings for rows in this queryset that lack one, using
+        batched OpenAI calls and bulk_update instead of one request per row.
+
+        Returns the number of rows considered.
+        """
+        from apps.embeddings.services import EmbeddingService
+        instances = list(
+            self.filter(embedding__isnull=True).select_related(
+                *getattr(self.model, 'EMBEDDING_SELECT_RELATED', ())
+            )
+        )
+        if instances:
+            EmbeddingService().generate_embeddings_for_instances(instances, batch_size)
+        return len(instances)
+
+
 class Opportunity(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     organisation = models.ForeignKey(Organisation, on_delete=models.CASCADE, related_name='opportunities')
@@ -13,22 +40,49 @@ class Opportunity(models.Model):
     description = models.TextField()
     location = models.CharField(max_length=255, blank=True, help_text="Job location (city, state, remote, etc.)")
 
-    # Semantic embedding for opportunity search
-    embedding = VectorField(dimensions=1536, null=True, blank=True)
+    # Semantic embedding for opportunity search, stored as float16 to halve
+    # the bytes the HNSW scan and heap fetches read per vector
+    embedding = HalfVectorField(dimensions=1536, null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EmbeddingQuerySet.as_manager()
+
+    # Relations read by get_embedding_text(), for bulk loading
+    EMBEDDING_SELECT_RELATED = ('organisation',)
+
     class Meta:
         indexes = [
             models.Index(fields=['title']),
             models.Index(fields=['organisation']),
             models.Index(fields=['location']),
+            # Keyset pagination order for the list endpoint's cursor mode
+            models.Index(fields=['-created_at', '-id'], name='opp_created_id_idx'),
+            # Trigram indexes for title/description/location__icontains (UPPER(field) LIKE ...)
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='opp_title_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='opp_description_trgm'),
+            GinIndex(OpClass(Upper('location'), name='gin_trgm_ops'), name='opp_location_trgm'),
         ]
 
     def __str__(self):
         return f"{self.title} at {self.organisation}"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        text_changed = not self._state.adding and (
+            update_fields is None or EMBEDDING_TEXT_SOURCE_FIELDS.intersection(update_fields)
+        )
+        if not text_changed:
+            super().save(*args, **kwargs)
+            return
+        # One transaction (one commit) for the row and the child resets
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Child embedding texts quote this opportunity; rebuild them lazily
+            self.opportunity_skills.update(embedding_text=None)
+            self.opportunity_experiences.update(embedding_text=None)
+
     def get_embedding_text(self):
         """Generate rich text for embedding with organisation and location context"""
         location_text = f" in {self.location}" if self.location else ""
@@ -44,7 +98,7 @@ class Opportunity(models.Model):
 
     def ensure_embedding(self):
         """Generate embedding if it doesn't exist"""
-        if not self.embedding:
+        if self.embedding is None:
             self.generate_embedding()
 
 
@@ -66,15 +120,35 @@ class OpportunitySkill(models.Model):
     # Semantic embedding for skill requirement with job context
     embedding = VectorField(dimensions=1536, null=True, blank=True)
     
+    # Cached output of build_embedding_text(), refreshed on save
+    embedding_text = models.TextField(null=True, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = EmbeddingQuerySet.as_manager()
+    
+    # Relations read by build_embedding_text(), for bulk loading
+    EMBEDDING_SELECT_RELATED = ('skill', 'opportunity__organisation')
+    
     class Meta:
         unique_together = ['opportunity', 'skill']
     
     def __str__(self):
         return f"{self.opportunity} - {self.skill} ({self.requirement_type})"
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'skill', 'requirement_type'}.intersection(update_fields):
+            self.embedding_text = self.build_embedding_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'embedding_text'}
+        super().save(*args, **kwargs)
+    
     def get_embedding_text(self):
+        """Return the cached embedding text, rebuilding it if stale"""
+        return self.embedding_text or self.build_embedding_text()
+    
+    def build_embedding_text(self):
         """Generate rich text for embedding with requirement context and job details"""
         job_context = f"{self.opportunity.title} at {self.opportunity.organisation.name}"
         description_snippet = self.opportunity.description[:150] + "..." if len(self.opportunity.description) > 150 else self.opportunity.description
@@ -108,13 +182,33 @@ class OpportunityExperience(models.Model):
     # Semantic embedding for experience requirements
     embedding = VectorField(dimensions=1536, null=True, blank=True)
     
+    # Cached output of build_embedding_text(), refreshed on save
+    embedding_text = models.TextField(null=True, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EmbeddingQuerySet.as_manager()
+    
+    # Relations read by build_embedding_text(), for bulk loading
+    EMBEDDING_SELECT_RELATED = ('opportunity__organisation',)
+    
     def __str__(self):
         return f"{self.opportunity} - {self.description[:50]}..."
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            self.embedding_text = self.build_embedding_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'embedding_text'}
+        super().save(*args, **kwargs)
+    
     def get_embedding_text(self):
+        """Return the cached embedding text, rebuilding it if stale"""
+        return self.embedding_text or self.build_embedding_text()
+    
+    def build_embedding_text(self):
         """Generate rich text for embedding with job context"""
         job_context = f"{self.opportunity.title} at {self.opportunity.organisation.name}"
         return f"Experience requirement for {job_context}: {self.description}"
@@ -2,19 +2,38 @@
 Tests for opportunities app API endpoints.
 """
 
+from unittest import mock
 from django.test import TestCase
 from ninja.testing import TestClient
+from apps.opportunities import api as opportunities_api
 from apps.opportunities.api import opportunities_router
-from apps.opportunities.models import Opportunity
+from apps.opportunities.models import Opportunity, OpportunitySkill, OpportunityExperience
 from apps.organisations.models import Organisation
+from apps.skills.models import Skill
 import numpy as np
 
 
+def _unit_vector(dimensions=1536):
+    """Random embedding scaled to unit length, as stored embeddings are."""
+    vector = np.random.rand(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
 class OpportunitiesAPITest(TestCase):
     """Test opportunities API endpoints."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # TestClient is stateless, so one instance serves every test
+        cls.api_client = TestClient(opportunities_router)
+
     def setUp(self):
-        self.client = TestClient(opportunities_router)
+        # Django's _pre_setup puts a fresh django.test.Client on self.client
+        # before each test, so the shared client is assigned here
+        self.client = self.api_client
+        # Don't carry the cached "any embeddings?" answer across tests
+        opportunities_api._embeddings_present = None
 
     def test_list_opportunities_empty(self):
         """Test listing opportunities when empty."""
@@ -73,8 +92,10 @@ class OpportunitiesAPITest(TestCase):
             organisation=org1
         )
 
-        # Test basic listing
-        response = self.client.get("/")
+        # Test basic listing: page (organisation joined) + skills + experiences,
+        # independent of the number of results
+        with self.assertNumQueries(3):
+            response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["total"], 3)
@@ -112,8 +133,10 @@ class OpportunitiesAPITest(TestCase):
         self.assertEqual(data["page"], 2)
         self.assertFalse(data["has_next"])
 
-        # Test combined filters
-        response = self.client.get("/?q=developer&organisation=TechCorp&page_size=10")
+        # Test combined filters (no embeddings yet: one presence check, then
+        # hybrid runs as keyword search without embedding the query)
+        with self.assertNumQueries(4):
+            response = self.client.get("/?q=developer&organisation=TechCorp&page_size=10")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["total"], 2)
@@ -121,6 +144,32 @@ class OpportunitiesAPITest(TestCase):
         self.assertIn("Senior Python Developer", titles)
         self.assertIn("Frontend Developer", titles)
 
+    def test_list_opportunities_cursor_pagination(self):
+        """Cursor mode walks newest-first pages via next_cursor."""
+        org = Organisation.objects.create(name="TechCorp")
+        for i in range(3):
+            Opportunity.objects.create(title=f"Role {i}", description="Job", organisation=org)
+
+        response = self.client.get("/?cursor=&page_size=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([opp["title"] for opp in data["results"]], ["Role 2", "Role 1"])
+        self.assertEqual(data["total"], 3)
+        self.assertIsNone(data["page"])
+        self.assertTrue(data["has_next"])
+
+        response = self.client.get(f"/?cursor={data['next_cursor']}&page_size=2")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([opp["title"] for opp in data["results"]], ["Role 0"])
+        # Later cursor pages skip the count
+        self.assertIsNone(data["total"])
+        self.assertFalse(data["has_next"])
+        self.assertIsNone(data["next_cursor"])
+
+        response = self.client.get("/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
     def test_list_opportunities_semantic_search_fallback(self):
         """Test semantic search mode and fallback behavior."""
         # Create test data
@@ -157,22 +206,93 @@ class OpportunitiesAPITest(TestCase):
             title="Python Developer",
             description="Django web development",
             organisation=org,
-            embedding=np.random.rand(1536).astype(np.float32)
+            embedding=_unit_vector()
         )
         opp2 = Opportunity.objects.create(
             title="Data Analyst",
             description="SQL and Excel skills",
             organisation=org,
-            embedding=np.random.rand(1536).astype(np.float32)
+            embedding=_unit_vector()
         )
 
         # Test semantic mode with embeddings
         response = self.client.get("/?q=python&mode=semantic")
         self.assertEqual(response.status_code, 200)
+        # The total comes from the page itself when it is the last one
+        data = response.json()
+        self.assertEqual(data["total"], len(data["results"]))
+        self.assertFalse(data["has_next"])
         # Note: Actual semantic matching depends on embedding similarity
         # This test ensures the endpoint doesn't crash
 
         # Test hybrid mode with embeddings
         response = self.client.get("/?q=django&mode=hybrid")
         self.assertEqual(response.status_code, 200)
-        # Similar to semantic, ensures no crashes
\ No newline at end of file
+        # Similar to semantic, ensures no crashes
+
+    def test_ranked_search_pages_past_the_total_cap(self):
+        """Ranked pages past RANKED_TOTAL_CAP still report a next page, with the total marked capped."""
+        org = Organisation.objects.create(name="TestOrg")
+        for i in range(3):
+            Opportunity.objects.create(
+                title=f"Python Role {i}", description="Python", organisation=org, embedding=_unit_vector()
+            )
+
+        query_embedding = mock.AsyncMock(return_value=_unit_vector().tolist())
+        with mock.patch.object(opportunities_api, 'aget_query_embedding', query_embedding), \
+                mock.patch.object(opportunities_api, 'RANKED_TOTAL_CAP', 1):
+            response = self.client.get("/?q=python&mode=hybrid&page=2&page_size=1")
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(len(data["results"]), 1)
+            self.assertTrue(data["has_next"])
+            self.assertTrue(data["total_capped"])
+            self.assertEqual(data["total"], 3)
+
+            response = self.client.get("/?q=python&mode=hybrid&page=3&page_size=1")
+            data = response.json()
+            self.assertFalse(data["has_next"])
+            self.assertFalse(data["total_capped"])
+            self.assertEqual(data["total"], 3)
+
+    def _seed_opportunities(self, count=20, skills_per=5, experiences_per=3):
+        """Create opportunities with skills and experiences for query-budget tests."""
+        org = Organisation.objects.create(name="BudgetOrg")
+        skills = [Skill.objects.create(name=f"Skill {i}") for i in range(skills_per)]
+        opportunities = []
+        for i in range(count):
+            opp = Opportunity.objects.create(
+                title=f"Role {i}",
+                description="Query budget test role",
+                organisation=org
+            )
+            for skill in skills:
+                OpportunitySkill.objects.create(opportunity=opp, skill=skill)
+            for j in range(experiences_per):
+                OpportunityExperience.objects.create(opportunity=opp, description=f"Experience {j}")
+            opportunities.append(opp)
+        return opportunities
+
+    def test_list_opportunities_query_budget(self):
+        """Listing opportunities uses a fixed number of queries regardless of page size."""
+        self._seed_opportunities()
+
+        # Page (with organisation join and window total) + skills query + experiences query
+        with self.assertNumQueries(3):
+            response = self.client.get("/?page_size=20")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["results"]), 20)
+        self.assertTrue(all(len(opp["skills"]) == 5 for opp in data["results"]))
+        self.assertTrue(all(len(opp["experiences"]) == 3 for opp in data["results"]))
+
+    def test_get_opportunity_query_budget(self):
+        """Getting an opportunity does not issue per-skill or per-experience queries."""
+        opp = self._seed_opportunities(count=1)[0]
+
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/{opp.id}")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["skills"]), 5)
+        self.assertEqual(len(data["experiences"]), 3)
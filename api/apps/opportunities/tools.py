@@ -3,7 +3,8 @@ Tools for opportunities app using LangChain BaseTool.
 Provides tools for managing job opportunities, candidate discovery, and talent pool analysis.
 """
 
-from typing import Optional, List, Dict, Any
+import asyncio
+from typing import Optional, List, Dict, Any, Tuple
 from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun, AsyncCallbackManagerForToolRun
 from pydantic import BaseModel, Field
@@ -11,12 +12,251 @@ from datetime import datetime
 
 # Django imports
 from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
+from apps.applications.models import OpportunityQuestion
 from apps.opportunities.models import Opportunity, OpportunitySkill
-from apps.organisations.models import Organisation
+from apps.organisations.models import Organisation, forget_organisation_name, get_or_create_organisation_id
 from apps.skills.models import Skill
 
 
+def _related_count(model):
+    """
+    Count rows of ``model`` per opportunity as a correlated subquery.
+
+    Annotating several Count() joins on one queryset multiplies rows
+    (questions x skills); a subquery per relation keeps each count independent.
+    """
+    counts = (
+        model.objects.filter(opportunity=OuterRef('pk'))
+        .order_by()
+        .values('opportunity')
+        .annotate(c=Count('*'))
+        .values('c')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _get_or_create_skills(names: List[str]) -> Dict[str, Skill]:
+    """Fetch skills by name, bulk-creating any that are missing."""
+    skills = Skill.objects.in_bulk(names, field_name='name')
+    missing = [name for name in names if name not in skills]
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        skills.update(Skill.objects.in_bulk(missing, field_name='name'))
+    return skills
+
+
+def _bulk_add_opportunity_skills(opportunity: Opportunity, skill_names: List[str],
+                                 requirement_type: str = 'required') -> List[OpportunitySkill]:
+    """
+    Attach skills to an opportunity in a constant number of queries.
+
+    bulk_create() skips save(), so the cached embedding text is filled in here.
+    Expects ``opportunity.organisation`` to be loaded, and is run inside the
+    caller's transaction (_create_opportunity / _update_opportunity).
+    """
+    names = list(dict.fromkeys(skill_names))
+    if not names:
+        return []
+
+    skills = _get_or_create_skills(names)
+    opp_skills = [
+        OpportunitySkill(opportunity=opportunity, skill=skills[name], requirement_type=requirement_type)
+        for name in names
+    ]
+    for opp_skill in opp_skills:
+        opp_skill.embedding_text = opp_skill.build_embedding_text()
+    OpportunitySkill.objects.bulk_create(opp_skills)
+    return opp_skills
+
+
+async def _aensure_embeddings(opp_skills: List[OpportunitySkill], concurrency: int = 8) -> None:
+    """
+    Generate missing embeddings for opportunity skills concurrently.
+
+    Requests to the embedding API overlap (bounded by ``concurrency`` to stay
+    within provider rate limits) and the results are written in one bulk_update.
+    """
+    from apps.embeddings.services import EmbeddingService
+
+    pending = [opp_skill for opp_skill in opp_skills if opp_skill.embedding is None]
+    if not pending:
+        return
+
+    service = EmbeddingService()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed(opp_skill):
+        async with semaphore:
+            opp_skill.embedding = await service.agenerate_embedding(opp_skill.get_embedding_text())
+
+    await asyncio.gather(*(embed(opp_skill) for opp_skill in pending))
+    await sync_to_async(OpportunitySkill.objects.bulk_update)(pending, ['embedding'])
+
+
+def _ensure_embeddings(opp_skills: List[OpportunitySkill]) -> None:
+    """Sync counterpart of _aensure_embeddings: one batched embedding request."""
+    from apps.embeddings.services import EmbeddingService
+
+    pending = [opp_skill for opp_skill in opp_skills if opp_skill.embedding is None]
+    if pending:
+        EmbeddingService().generate_embeddings_for_instances(pending)
+
+
+def _retrying_stale_organisation(organisation_name: Optional[str], write, *args, **kwargs):
+    """
+    Run a write that references get_or_create_organisation_id(organisation_name).
+
+    A cached id can outlive its row when another process deletes the
+    organisation, and then the foreign key check fails when the write
+    commits. In that case the cached entry is dropped and the write is retried
+    once with a fresh lookup.
+    """
+    try:
+        return write(*args, **kwargs)
+    except IntegrityError:
+        if not organisation_name:
+            raise
+        forget_organisation_name(organisation_name)
+        return write(*args, **kwargs)
+
+
+def _create_opportunity(title: str, company_name: str, description: str,
+                        required_skills: Optional[List[str]]) -> Tuple[Opportunity, List[OpportunitySkill]]:
+    """Create an opportunity and its required skills in one transaction."""
+    return _retrying_stale_organisation(
+        company_name, _create_opportunity_once, title, company_name, description, required_skills
+    )
+
+
+def _create_opportunity_once(title: str, company_name: str, description: str,
+                             required_skills: Optional[List[str]]) -> Tuple[Opportunity, List[OpportunitySkill]]:
+    with transaction.atomic():
+        # Local reference from the cached id; no SELECT for a known company
+        organisation = Organisation(pk=get_or_create_organisation_id(company_name), name=company_name)
+        opportunity = Opportunity.objects.create(
+            title=title,
+            organisation=organisation,
+            description=description
+        )
+        opp_skills = _bulk_add_opportunity_skills(opportunity, required_skills or [])
+    return opportunity, opp_skills
+
+
+def _created_message(title: str, company_name: str, opportunity: Opportunity,
+                     opp_skills: List[OpportunitySkill]) -> str:
+    created_skills = [opp_skill.skill.name for opp_skill in opp_skills]
+    skills_summary = f"\n• Required skills: {', '.join(created_skills)}" if created_skills else ""
+
+    return f"""✅ Job opportunity created successfully!
+
+📋 Opportunity Details:
+• Title: {title}
+• Company: {company_name}
+• Opportunity ID: {opportunity.id}{skills_summary}
+
+🎯 Next Steps:
+You can now use find_candidates_for_opportunity with ID: {opportunity.id}
+"""
+
+
+def _update_opportunity(opportunity_id: str, title: Optional[str] = None, description: Optional[str] = None,
+                        organization_name: Optional[str] = None, add_skills: Optional[List[str]] = None,
+                        remove_skills: Optional[List[str]] = None):
+    """
+    Apply an opportunity update in one transaction.
+
+    Returns (opportunity, updated_fields, added opportunity skills, removed skill names).
+    Embeddings for the added skills are left to the caller.
+    """
+    return _retrying_stale_organisation(
+        organization_name, _update_opportunity_once, opportunity_id, title, description,
+        organization_name, add_skills, remove_skills
+    )
+
+
+def _update_opportunity_once(opportunity_id: str, title: Optional[str], description: Optional[str],
+                             organization_name: Optional[str], add_skills: Optional[List[str]],
+                             remove_skills: Optional[List[str]]):
+    with transaction.atomic():
+        # Get the existing opportunity
+        opportunity = Opportunity.objects.select_related('organisation').get(id=opportunity_id)
+
+        updated_fields = []
+
+        # Update basic opportunity information
+        opportunity_updated = False
+        if title:
+            opportunity.title = title
+            opportunity_updated = True
+            updated_fields.append(f"Title: {title}")
+
+        if description:
+            opportunity.description = description
+            opportunity_updated = True
+            updated_fields.append(f"Description updated")
+
+        # Update organization if specified
+        if organization_name:
+            opportunity.organisation = Organisation(
+                pk=get_or_create_organisation_id(organization_name), name=organization_name
+            )
+            opportunity_updated = True
+            updated_fields.append(f"Organization: {organization_name}")
+
+        if opportunity_updated:
+            opportunity.save()
+
+        # Add new skills, skipping those already attached to this opportunity
+        opp_skills = []
+        if add_skills:
+            existing_names = set(OpportunitySkill.objects.filter(
+                opportunity=opportunity, skill__name__in=add_skills
+            ).values_list('skill__name', flat=True))
+            opp_skills = _bulk_add_opportunity_skills(opportunity, [
+                skill_name for skill_name in add_skills if skill_name not in existing_names
+            ])
+
+        # Remove skills in one DELETE
+        removed_skills = []
+        if remove_skills:
+            to_remove = OpportunitySkill.objects.filter(
+                opportunity=opportunity, skill__name__in=remove_skills
+            )
+            deleted_names = set(to_remove.values_list('skill__name', flat=True))
+            to_remove.delete()
+            removed_skills = [
+                skill_name for skill_name in dict.fromkeys(remove_skills)
+                if skill_name in deleted_names
+            ]
+
+    return opportunity, updated_fields, opp_skills, removed_skills
+
+
+def _updated_message(opportunity: Opportunity, updated_fields: List[str],
+                     opp_skills: List[OpportunitySkill], removed_skills: List[str]) -> str:
+    added_skills = [opp_skill.skill.name for opp_skill in opp_skills]
+
+    result_parts = [f"✅ Opportunity updated successfully: {opportunity.title} at {opportunity.organisation.name}"]
+
+    if updated_fields:
+        result_parts.append(f"\n📝 Updated: {', '.join(updated_fields)}")
+
+    if added_skills:
+        result_parts.append(f"\n➕ Added skills: {', '.join(added_skills)}")
+
+    if removed_skills:
+        result_parts.append(f"\n➖ Removed skills: {', '.join(removed_skills)}")
+
+    if not (updated_fields or added_skills or removed_skills):
+        result_parts.append("\n📋 No changes were made to the opportunity.")
+
+    return ''.join(result_parts)
+
+
 # =====================================================
 # OPPORTUNITY MANAGEMENT TOOLS
 # =====================================================
@@ -66,62 +306,12 @@ class CreateOpportunityTool(BaseTool):
              run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
         """Execute the create opportunity tool synchronously."""
         try:
-            import asyncio
-            from asgiref.sync import async_to_sync
-
-            @async_to_sync
-            async def run_service():
-                # Get or create the organization
-                organisation, created = await sync_to_async(Organisation.objects.get_or_create)(
-                    name=company_name
-                )
+            opportunity, opp_skills = _create_opportunity(title, company_name, description, required_skills)
 
-                # Create the opportunity
-                opportunity = await sync_to_async(Opportunity.objects.create)(
-                    title=title,
-                    organisation=organisation,
-                    description=description
-                )
+            # Generate embeddings for new opportunity skills
+            _ensure_embeddings(opp_skills)
 
-                # Add required skills if provided
-                created_skills = []
-                if required_skills:
-                    for skill_name in required_skills:
-                        # Get or create the skill (Skill model only has name field)
-                        skill, skill_created = await sync_to_async(Skill.objects.get_or_create)(
-                            name=skill_name
-                        )
-
-                        # Create opportunity skill relationship
-                        opp_skill = await sync_to_async(OpportunitySkill.objects.create)(
-                            opportunity=opportunity,
-                            skill=skill,
-                            requirement_type='required'
-                        )
-
-                        # Generate embedding for new opportunity skill
-                        await sync_to_async(opp_skill.ensure_embedding)()
-
-                        created_skills.append(skill_name)
-
-                return opportunity, created_skills
-
-            opportunity, created_skills = run_service()
-
-            skills_summary = f"\n• Required skills: {', '.join(created_skills)}" if created_skills else ""
-
-            result = f"""✅ Job opportunity created successfully!
-
-📋 Opportunity Details:
-• Title: {title}
-• Company: {company_name}
-• Opportunity ID: {opportunity.id}{skills_summary}
-
-🎯 Next Steps:
-You can now use find_candidates_for_opportunity with ID: {opportunity.id}
-"""
-
-            return result
+            return _created_message(title, company_name, opportunity, opp_skills)
 
         except Exception as e:
             return f"❌ Failed to create opportunity: {str(e)}"
@@ -132,53 +322,14 @@ You can now use find_candidates_for_opportunity with ID: {opportunity.id}
                    run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
         """Execute the create opportunity tool asynchronously."""
         try:
-            # Get or create the organization
-            organisation, created = await sync_to_async(Organisation.objects.get_or_create)(
-                name=company_name
-            )
-
-            # Create the opportunity
-            opportunity = await sync_to_async(Opportunity.objects.create)(
-                title=title,
-                organisation=organisation,
-                description=description
+            opportunity, opp_skills = await sync_to_async(_create_opportunity)(
+                title, company_name, description, required_skills
             )
 
-            # Add required skills if provided
-            created_skills = []
-            if required_skills:
-                for skill_name in required_skills:
-                    # Get or create the skill
-                    skill, skill_created = await sync_to_async(Skill.objects.get_or_create)(
-                        name=skill_name
-                    )
-
-                    # Create opportunity skill relationship
-                    opp_skill = await sync_to_async(OpportunitySkill.objects.create)(
-                        opportunity=opportunity,
-                        skill=skill,
-                        requirement_type='required'
-                    )
-
-                    # Generate embedding for new opportunity skill
-                    await sync_to_async(opp_skill.ensure_embedding)()
+            # Generate embeddings for new opportunity skills
+            await _aensure_embeddings(opp_skills)
 
-                    created_skills.append(skill_name)
-
-            skills_summary = f"\n• Required skills: {', '.join(created_skills)}" if created_skills else ""
-
-            result = f"""✅ Job opportunity created successfully!
-
-📋 Opportunity Details:
-• Title: {title}
-• Company: {company_name}
-• Opportunity ID: {opportunity.id}{skills_summary}
-
-🎯 Next Steps:
-You can now use find_candidates_for_opportunity with ID: {opportunity.id}
-"""
-
-            return result
+            return _created_message(title, company_name, opportunity, opp_skills)
 
         except Exception as e:
             return f"❌ Failed to create opportunity: {str(e)}"
@@ -222,16 +373,14 @@ class UpdateOpportunityTool(BaseTool):
              remove_skills: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
         """Execute the update opportunity tool synchronously."""
         try:
-            import asyncio
-            from asgiref.sync import async_to_sync
+            opportunity, updated_fields, opp_skills, removed_skills = _update_opportunity(
+                opportunity_id, title, description, organization_name, add_skills, remove_skills
+            )
 
-            @async_to_sync
-            async def run_service():
-                return await self._update_opportunity_async(
-                    opportunity_id, title, description, organization_name, add_skills, remove_skills
-                )
+            # Generate embeddings for new opportunity skills
+            _ensure_embeddings(opp_skills)
 
-            return run_service()
+            return _updated_message(opportunity, updated_fields, opp_skills, removed_skills)
 
         except Exception as e:
             return f"❌ Failed to update opportunity: {str(e)}"
@@ -240,105 +389,15 @@ class UpdateOpportunityTool(BaseTool):
                    organization_name: Optional[str] = None, add_skills: Optional[List[str]] = None,
                    remove_skills: Optional[List[str]] = None, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
         """Execute the update opportunity tool asynchronously."""
-        return await self._update_opportunity_async(
-            opportunity_id, title, description, organization_name, add_skills, remove_skills
-        )
-
-    async def _update_opportunity_async(self, opportunity_id: str, title: Optional[str] = None,
-                                       description: Optional[str] = None, organization_name: Optional[str] = None,
-                                       add_skills: Optional[List[str]] = None, remove_skills: Optional[List[str]] = None) -> str:
-        """Internal method to update opportunity."""
         try:
-            # Get the existing opportunity
-            opportunity = await sync_to_async(
-                Opportunity.objects.select_related('organisation').get
-            )(id=opportunity_id)
-
-            updated_fields = []
-
-            # Update basic opportunity information
-            opportunity_updated = False
-            if title:
-                opportunity.title = title
-                opportunity_updated = True
-                updated_fields.append(f"Title: {title}")
-
-            if description:
-                opportunity.description = description
-                opportunity_updated = True
-                updated_fields.append(f"Description updated")
-
-            # Update organization if specified
-            if organization_name:
-                organisation, created = await sync_to_async(Organisation.objects.get_or_create)(
-                    name=organization_name
-                )
-                opportunity.organisation = organisation
-                opportunity_updated = True
-                updated_fields.append(f"Organization: {organization_name}")
-
-            if opportunity_updated:
-                await sync_to_async(opportunity.save)()
-
-            # Add new skills
-            added_skills = []
-            if add_skills:
-                for skill_name in add_skills:
-                    # Get or create the skill
-                    skill, skill_created = await sync_to_async(Skill.objects.get_or_create)(
-                        name=skill_name
-                    )
-
-                    # Check if skill already exists for this opportunity
-                    skill_exists = await sync_to_async(
-                        lambda: OpportunitySkill.objects.filter(opportunity=opportunity, skill=skill).exists()
-                    )()
-                    if not skill_exists:
-                        # Create new opportunity skill relationship
-                        opp_skill = await sync_to_async(OpportunitySkill.objects.create)(
-                            opportunity=opportunity,
-                            skill=skill,
-                            requirement_type='required'
-                        )
-
-                        # Generate embedding for new opportunity skill
-                        await sync_to_async(opp_skill.ensure_embedding)()
-
-                        added_skills.append(skill_name)
-
-            # Remove skills
-            removed_skills = []
-            if remove_skills:
-                for skill_name in remove_skills:
-                    # Find the skill
-                    skill = await sync_to_async(
-                        lambda sn=skill_name: Skill.objects.filter(name=sn).first()
-                    )(skill_name)
-
-                    if skill:
-                        # Remove the OpportunitySkill relationship
-                        deleted_count, _ = await sync_to_async(
-                            lambda: OpportunitySkill.objects.filter(opportunity=opportunity, skill=skill).delete()
-                        )()
-                        if deleted_count > 0:
-                            removed_skills.append(skill_name)
-
-            # Build response
-            result_parts = [f"✅ Opportunity updated successfully: {opportunity.title} at {opportunity.organisation.name}"]
-
-            if updated_fields:
-                result_parts.append(f"\n📝 Updated: {', '.join(updated_fields)}")
-
-            if added_skills:
-                result_parts.append(f"\n➕ Added skills: {', '.join(added_skills)}")
-
-            if removed_skills:
-                result_parts.append(f"\n➖ Removed skills: {', '.join(removed_skills)}")
-
-            if not (updated_fields or added_skills or removed_skills):
-                result_parts.append("\n📋 No changes were made to the opportunity.")
-
-            return ''.join(result_parts)
+            opportunity, updated_fields, opp_skills, removed_skills = await sync_to_async(_update_opportunity)(
+                opportunity_id, title, description, organization_name, add_skills, remove_skills
+            )
+
+            # Generate embeddings for new opportunity skills
+            await _aensure_embeddings(opp_skills)
+
+            return _updated_message(opportunity, updated_fields, opp_skills, removed_skills)
 
         except Exception as e:
             return f"❌ Failed to update opportunity: {str(e)}"
@@ -361,15 +420,14 @@ class ListOpportunitiesTool(BaseTool):
              run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
         """Execute the list opportunities tool synchronously."""
         try:
-            from django.db.models import Count
-
             def fetch_opportunities():
                 qs = Opportunity.objects.select_related('organisation').annotate(
-                    questions_count=Count('questions'), skills_count=Count('opportunity_skills')
+                    questions_count=_related_count(OpportunityQuestion),
+                    skills_count=_related_count(OpportunitySkill),
                 ).order_by('-created_at')
 
                 if search:
-                    qs = qs.filter(title__icontains=search) | qs.filter(organisation__name__icontains=search)
+                    qs = qs.filter(Q(title__icontains=search) | Q(organisation__name__icontains=search))
 
                 return list(qs[: (limit or 20)])
 
@@ -388,15 +446,14 @@ class ListOpportunitiesTool(BaseTool):
                    run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
         """Execute the list opportunities tool asynchronously."""
         try:
-            from django.db.models import Count
-
             def fetch_opportunities():
                 qs = Opportunity.objects.select_related('organisation').annotate(
-                    questions_count=Count('questions'), skills_count=Count('opportunity_skills')
+                    questions_count=_related_count(OpportunityQuestion),
+                    skills_count=_related_count(OpportunitySkill),
                 ).order_by('-created_at')
 
                 if search:
-                    qs = qs.filter(title__icontains=search) | qs.filter(organisation__name__icontains=search)
+                    qs = qs.filter(Q(title__icontains=search) | Q(organisation__name__icontains=search))
 
                 return list(qs[: (limit or 20)])
 
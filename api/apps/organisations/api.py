@@ -3,49 +3,84 @@ API endpoints for organisations app using Django Ninja.
 """
 
 from ninja import Router, Schema
-from typing import List
+from pydantic import TypeAdapter
+from typing import List, TypedDict
+from uuid import UUID
 from datetime import datetime
 from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import F, Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
 from apps.organisations.models import Organisation
 from apps.opportunities.models import Opportunity, OpportunitySkill, OpportunityExperience
 from apps.skills.models import Skill
+from apps.accounts.utils import employer_cache_key, verify_token
 from ninja.errors import HttpError
+from ninja.security import HttpBearer
+import functools
+import itertools
 import jwt
-from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 
 # Create router for organisations endpoints
 organisations_router = Router()
 
 
-async def get_user_from_token(request):
-    """Extract and validate JWT token from request."""
-    auth_header = request.headers.get('authorization', '')
+# Employer group membership is cached per user for at most this long. Group
+# changes and user deletes drop the flag through the accounts signal handlers,
+# but only in the process that made them; see apps.accounts.utils on running
+# several workers.
+EMPLOYER_CACHE_TTL = 300
 
-    if not auth_header.startswith('Bearer '):
-        raise HttpError(401, "No token provided")
 
-    token = auth_header[7:]  # Remove 'Bearer ' prefix
+async def user_from_token(token: str):
+    """
+    Validate a JWT and resolve its user.
 
+    Returns a User reference carrying only the id (enough for relation lookups
+    such as ``user.managed_organisations``); check_employer_permissions()
+    reads the employer flag from its own cache.
+    """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        user_id = payload.get('user_id')
-        if user_id:
-            from django.contrib.auth import get_user_model
-            User = get_user_model()
-            user = await sync_to_async(User.objects.get)(id=user_id)
-            return user
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, KeyError):
-        pass
+        user_id = await verify_token(token)
+    except jwt.InvalidTokenError:
+        raise HttpError(401, "Invalid token")
+    return get_user_model()(pk=user_id)
+
+
+@functools.cache
+def _employer_membership_sql() -> str:
+    """Employer-group membership check as static SQL, built once from model metadata."""
+    quote = connection.ops.quote_name
+    through = get_user_model().groups.through._meta
+    return (
+        f"SELECT 1 FROM {quote(through.db_table)} ug "
+        f"JOIN {quote(Group._meta.db_table)} g ON g.id = ug.{quote(through.get_field('group').column)} "
+        f"WHERE ug.{quote(through.get_field('user').column)} = %s AND g.name = %s LIMIT 1"
+    )
+
 
-    raise HttpError(401, "Invalid token")
+@sync_to_async
+def _in_employer_group(user_id) -> bool:
+    # Raw cursor: skips rebuilding and compiling the ORM query on every call
+    with connection.cursor() as cursor:
+        cursor.execute(_employer_membership_sql(), [user_id, 'employer'])
+        return cursor.fetchone() is not None
 
 
 async def check_employer_permissions(user):
     """Check if user has employer permissions."""
-    # Check if user has employer group
-    has_employer_group = await sync_to_async(
-        lambda: user.groups.filter(name='employer').exists()
-    )()
+    # Freshly loaded users carry the flag; otherwise try the per-user cache
+    # before checking the DB
+    has_employer_group = getattr(user, '_is_employer', None)
+    if has_employer_group is None:
+        key = employer_cache_key(user.pk)
+        has_employer_group = await cache.aget(key)
+        if has_employer_group is None:
+            has_employer_group = await _in_employer_group(user.pk)
+            await cache.aset(key, has_employer_group, EMPLOYER_CACHE_TTL)
 
     if not has_employer_group:
         raise HttpError(403, "Employer access required")
@@ -53,6 +88,86 @@ async def check_employer_permissions(user):
     return True
 
 
+class EmployerAuth(HttpBearer):
+    """
+    Bearer auth for the managed endpoints: resolves the token and checks the
+    employer group once per request, leaving the user on ``request.auth``.
+    """
+
+    async def authenticate(self, request, token):
+        user = await user_from_token(token)
+        await check_employer_permissions(user)
+        return user
+
+
+employer_auth = EmployerAuth()
+
+
+async def get_managed_organisation_or_404(request, organisation_slug: str, *fields: str) -> Organisation:
+    """
+    Fetch an organisation managed by the authenticated employer in one query
+    (the manager check joins through the M2M table); 404 if it isn't theirs.
+
+    Pass ``fields`` to load only those columns when the caller needs no more.
+    """
+    queryset = Organisation.objects.filter(managers=request.auth.pk, slug=organisation_slug)
+    if fields:
+        queryset = queryset.only(*fields)
+    organisation = await queryset.afirst()
+    if organisation is None:
+        raise HttpError(404, "Organisation not found or access denied")
+    return organisation
+
+
+def _canonical_uuid(value: str):
+    """The canonical string form of a UUID in any accepted spelling, or None if malformed."""
+    try:
+        return str(UUID(value))
+    except ValueError:
+        return None
+
+
+def _with_opportunity_details(queryset):
+    """
+    Prefetch skills (skill names joined in the same query) and experiences,
+    so an opportunity's details cost two extra queries however many rows load.
+
+    Only the serialized columns are read: the skill name comes back as a
+    ``skill_name`` annotation rather than a hydrated Skill, and the embedding
+    vectors on both child tables are never fetched.
+    """
+    return queryset.prefetch_related(
+        Prefetch(
+            'opportunity_skills',
+            queryset=OpportunitySkill.objects.only('id', 'opportunity', 'requirement_type').annotate(
+                skill_name=F('skill__name')
+            ),
+        ),
+        Prefetch(
+            'opportunity_experiences',
+            queryset=OpportunityExperience.objects.only('id', 'opportunity', 'description'),
+        ),
+    )
+
+
+def managed_opportunities(request, organisation_slug: str):
+    """
+    Scope opportunities to the given organisation managed by the authenticated
+    employer, so an opportunity and its access check come back in one query.
+    """
+    return Opportunity.objects.filter(organisation__slug=organisation_slug, organisation__managers=request.auth.pk)
+
+
+async def get_managed_opportunity_or_404(request, organisation_slug: str, opportunity_id: str) -> Opportunity:
+    """A managed organisation's opportunity with its skills and experiences; 404 if not found or not theirs."""
+    opportunity = await _with_opportunity_details(
+        managed_opportunities(request, organisation_slug).filter(id=opportunity_id)
+    ).afirst()
+    if opportunity is None:
+        raise HttpError(404, "Organisation or opportunity not found or access denied")
+    return opportunity
+
+
 class OrganisationSchema(Schema):
     """Schema for Organisation model."""
     id: str
@@ -124,43 +239,65 @@ class OrganisationOpportunityUpdateSchema(Schema):
     description: str
 
 
-@organisations_router.get("/", response=List[OrganisationSchema], tags=["Organisations"])
-async def list_organisations(request):
-    """List all organisations."""
-    @sync_to_async
-    def get_organisations_sync():
-        return list(Organisation.objects.all())
-
-    organisations = await get_organisations_sync()
-    return [
-        OrganisationSchema(
-            id=str(org.id),
-            name=org.name,
-            slug=org.slug,
-            description=org.description,
-            website=org.website,
-            industry=org.industry,
-            created_at=org.created_at,
-            updated_at=org.updated_at
-        )
-        for org in organisations
-    ]
+class _OrganisationRow(TypedDict):
+    """
+    An Organisation.objects.values() row, serialized exactly like
+    OrganisationSchema (the UUID id dumps as its string form).
+    """
+    id: UUID
+    name: str
+    slug: str
+    description: str
+    website: str
+    industry: str
+    created_at: datetime
+    updated_at: datetime
 
 
-@organisations_router.post("/", response=OrganisationSchema, tags=["Organisations"])
-async def create_organisation(request, payload: OrganisationCreateSchema):
-    """Create a new organisation."""
-    @sync_to_async
-    def create_organisation_sync():
-        return Organisation.objects.create(
-            name=payload.name,
-            description=payload.description,
-            website=payload.website,
-            industry=payload.industry
-        )
+# Columns read for each serialized organisation
+_ORGANISATION_FIELDS = tuple(_OrganisationRow.__annotations__)
 
-    organisation = await create_organisation_sync()
-    return OrganisationSchema(
+# Cached adapters, built once at import: responses are dumped straight to JSON
+# bytes by pydantic-core instead of being re-validated and re-dumped by Ninja.
+# Organisation rows go in as plain dicts, with no schema instance per row.
+_ORGANISATION_ADAPTER = TypeAdapter(OrganisationSchema)
+_ORGANISATION_ROW_ADAPTER = TypeAdapter(_OrganisationRow)
+_ORGANISATION_ROW_LIST_ADAPTER = TypeAdapter(List[_OrganisationRow])
+_ORGANISATION_OPPORTUNITY_ADAPTER = TypeAdapter(OrganisationOpportunitySchema)
+
+# Rows fetched per round-trip when a list response is streamed
+STREAM_CHUNK_SIZE = 500
+
+
+def _json_response(adapter: TypeAdapter, items) -> HttpResponse:
+    """Serialize items with a cached adapter, bypassing Ninja's response validation."""
+    return HttpResponse(adapter.dump_json(items), content_type="application/json")
+
+
+def _stream_json_list(schemas) -> StreamingHttpResponse:
+    """
+    Stream an async iterable of schemas as a JSON array, serializing each item
+    as it arrives so memory stays bounded by one DB chunk, not the whole list.
+    """
+    async def chunks():
+        separator = b'['
+        async for schema in schemas:
+            yield separator
+            yield schema.model_dump_json()
+            separator = b','
+        yield b']' if separator == b',' else b'[]'
+
+    return StreamingHttpResponse(chunks(), content_type="application/json")
+
+
+def _organisation_values(queryset):
+    """Flat _OrganisationRow dicts, with no Organisation instances hydrated."""
+    return queryset.values(*_ORGANISATION_FIELDS)
+
+
+def _organisation_from_model(organisation) -> OrganisationSchema:
+    """Schema for a loaded Organisation instance."""
+    return OrganisationSchema.model_construct(
         id=str(organisation.id),
         name=organisation.name,
         slug=organisation.slug,
@@ -172,389 +309,237 @@ async def create_organisation(request, payload: OrganisationCreateSchema):
     )
 
 
+def _organisation_opportunity_from_model(opportunity) -> OrganisationOpportunitySchema:
+    """Schema for an opportunity loaded through _with_opportunity_details()."""
+    return OrganisationOpportunitySchema.model_construct(
+        id=str(opportunity.id),
+        title=opportunity.title,
+        description=opportunity.description,
+        skills=[
+            OpportunitySkillSchema.model_construct(
+                id=str(skill.id),
+                skill_name=skill.skill_name,
+                requirement_type=skill.requirement_type
+            )
+            for skill in opportunity.opportunity_skills.all()
+        ],
+        experiences=[
+            OpportunityExperienceSchema.model_construct(
+                id=str(exp.id),
+                description=exp.description
+            )
+            for exp in opportunity.opportunity_experiences.all()
+        ],
+        created_at=opportunity.created_at,
+        updated_at=opportunity.updated_at
+    )
+
+
+@sync_to_async
+def _organisation_list_response(queryset) -> HttpResponse:
+    """
+    JSON list of organisations, built from plain rows rather than model
+    instances. Fetching and dumping run in one worker-thread hop, keeping both
+    off the event loop, and rows are read and dumped a chunk at a time so only
+    one chunk of them is held alongside the JSON.
+    """
+    rows = _organisation_values(queryset).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    parts = []
+    while chunk := list(itertools.islice(rows, STREAM_CHUNK_SIZE)):
+        # Drop each chunk's own brackets; the parts are joined into one array
+        parts.append(_ORGANISATION_ROW_LIST_ADAPTER.dump_json(chunk)[1:-1])
+    return HttpResponse(b'[' + b','.join(parts) + b']', content_type="application/json")
+
+
+@organisations_router.get("/", response=List[OrganisationSchema], tags=["Organisations"])
+async def list_organisations(request):
+    """List all organisations."""
+    return await _organisation_list_response(Organisation.objects.all())
+
+
+@organisations_router.post("/", response=OrganisationSchema, tags=["Organisations"])
+async def create_organisation(request, payload: OrganisationCreateSchema):
+    """Create a new organisation."""
+    organisation = await Organisation.objects.acreate(
+        name=payload.name,
+        description=payload.description,
+        website=payload.website,
+        industry=payload.industry
+    )
+    return _json_response(_ORGANISATION_ADAPTER, _organisation_from_model(organisation))
+
+
 # Employer-focused organisation endpoints (integrated into main router)
 
-@organisations_router.get("/managed", response=List[OrganisationSchema], tags=["Organisations"])
+@organisations_router.get("/managed", response=List[OrganisationSchema], auth=employer_auth, tags=["Organisations"])
 async def list_managed_organisations(request):
     """List organisations managed by the authenticated employer user."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    return await _organisation_list_response(Organisation.objects.filter(managers=request.auth.pk))
 
-    @sync_to_async
-    def get_user_organisations_sync():
-        return list(user.managed_organisations.all())
-
-    organisations = await get_user_organisations_sync()
-    return [
-        OrganisationSchema(
-            id=str(org.id),
-            name=org.name,
-            slug=org.slug,
-            description=org.description,
-            website=org.website,
-            industry=org.industry,
-            created_at=org.created_at,
-            updated_at=org.updated_at
-        )
-        for org in organisations
-    ]
-
-
-@organisations_router.post("/managed", response=OrganisationSchema, tags=["Organisations"])
+
+@organisations_router.post("/managed", response=OrganisationSchema, auth=employer_auth, tags=["Organisations"])
 async def create_managed_organisation(request, payload: OrganisationCreateSchema):
     """Create a new organisation and assign it to the authenticated employer user."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
-
     @sync_to_async
     def create_organisation_sync():
-        org = Organisation.objects.create(
-            name=payload.name,
-            description=payload.description,
-            website=payload.website,
-            industry=payload.industry
-        )
-        # Add the user as a manager of this organisation
-        user.managed_organisations.add(org)
+        with transaction.atomic():
+            org = Organisation.objects.create(
+                name=payload.name,
+                description=payload.description,
+                website=payload.website,
+                industry=payload.industry
+            )
+            # Add the user as a manager of this organisation. The link is new,
+            # so it is inserted directly rather than via add(), which first
+            # selects the existing links to skip duplicates.
+            Managers = Organisation.managers.through
+            Managers.objects.bulk_create([Managers(user_id=request.auth.pk, organisation_id=org.pk)])
         return org
 
     organisation = await create_organisation_sync()
-    return OrganisationSchema(
-        id=str(organisation.id),
-        name=organisation.name,
-        slug=organisation.slug,
-        description=organisation.description,
-        website=organisation.website,
-        industry=organisation.industry,
-        created_at=organisation.created_at,
-        updated_at=organisation.updated_at
-    )
+    return _json_response(_ORGANISATION_ADAPTER, _organisation_from_model(organisation))
 
 
-@organisations_router.get("/managed/{organisation_slug}/", response=OrganisationSchema, tags=["Organisations"])
+@organisations_router.get("/managed/{organisation_slug}/", response=OrganisationSchema, auth=employer_auth, tags=["Organisations"])
 async def get_managed_organisation(request, organisation_slug: str):
     """Get a specific organisation by slug (must be managed by the authenticated employer user)."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    row = await _organisation_values(
+        Organisation.objects.filter(managers=request.auth.pk, slug=organisation_slug)
+    ).afirst()
+    if row is None:
+        raise HttpError(404, "Organisation not found or access denied")
 
-    @sync_to_async
-    def get_organisation_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            return org, None
-        except Organisation.DoesNotExist:
-            return None, "Organisation not found or access denied"
-
-    organisation, error = await get_organisation_sync()
-    if error:
-        raise HttpError(404, error)
-
-    return OrganisationSchema(
-        id=str(organisation.id),
-        name=organisation.name,
-        slug=organisation.slug,
-        description=organisation.description,
-        website=organisation.website,
-        industry=organisation.industry,
-        created_at=organisation.created_at,
-        updated_at=organisation.updated_at
-    )
+    return _json_response(_ORGANISATION_ROW_ADAPTER, row)
 
 
-@organisations_router.put("/managed/{organisation_slug}/", response=OrganisationSchema, tags=["Organisations"])
+@organisations_router.put("/managed/{organisation_slug}/", response=OrganisationSchema, auth=employer_auth, tags=["Organisations"])
 async def update_managed_organisation(request, organisation_slug: str, payload: OrganisationUpdateSchema):
     """Update a specific organisation by slug (must be managed by the authenticated employer user)."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    organisation = await get_managed_organisation_or_404(request, organisation_slug)
 
-    @sync_to_async
-    def update_organisation_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            org.name = payload.name
-            org.description = payload.description
-            org.website = payload.website
-            org.industry = payload.industry
-            org.save()
-            return org, None
-        except Organisation.DoesNotExist:
-            return None, "Organisation not found or access denied"
-
-    organisation, error = await update_organisation_sync()
-    if error:
-        raise HttpError(404, error)
-
-    return OrganisationSchema(
-        id=str(organisation.id),
-        name=organisation.name,
-        slug=organisation.slug,
-        description=organisation.description,
-        website=organisation.website,
-        industry=organisation.industry,
-        created_at=organisation.created_at,
-        updated_at=organisation.updated_at
-    )
+    organisation.name = payload.name
+    organisation.description = payload.description
+    organisation.website = payload.website
+    organisation.industry = payload.industry
+    await organisation.asave(update_fields=['name', 'description', 'website', 'industry', 'updated_at'])
+
+    return _json_response(_ORGANISATION_ADAPTER, _organisation_from_model(organisation))
 
 
-@organisations_router.delete("/managed/{organisation_slug}/", response=dict, tags=["Organisations"])
+@organisations_router.delete("/managed/{organisation_slug}/", response=dict, auth=employer_auth, tags=["Organisations"])
 async def delete_managed_organisation(request, organisation_slug: str):
     """Delete a specific organisation by slug (must be managed by the authenticated employer user)."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
-
-    @sync_to_async
-    def delete_organisation_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            org.delete()
-            return True, None
-        except Organisation.DoesNotExist:
-            return False, "Organisation not found or access denied"
-
-    success, error = await delete_organisation_sync()
-    if error:
-        raise HttpError(404, error)
+    organisation = await get_managed_organisation_or_404(request, organisation_slug, 'id')
+    await organisation.adelete()
 
     return {"success": True, "message": "Organisation deleted successfully"}
 
 
 # Opportunity management endpoints for organisations
 
-@organisations_router.get("/managed/{organisation_slug}/opportunities/", response=List[OrganisationOpportunitySchema], tags=["Organisations"])
+@organisations_router.get("/managed/{organisation_slug}/opportunities/", response=List[OrganisationOpportunitySchema], auth=employer_auth, tags=["Organisations"])
 async def list_organisation_opportunities(request, organisation_slug: str):
     """List opportunities for a managed organisation."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    org = await get_managed_organisation_or_404(request, organisation_slug, 'id')
 
-    @sync_to_async
-    def get_opportunities_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            opportunities = list(org.opportunities.all().prefetch_related('opportunity_skills__skill', 'opportunity_experiences'))
-            return opportunities, None
-        except Organisation.DoesNotExist:
-            return None, "Organisation not found or access denied"
-
-    opportunities, error = await get_opportunities_sync()
-    if error:
-        raise HttpError(404, error)
-
-    @sync_to_async
-    def build_response_data():
-        return [
-            OrganisationOpportunitySchema(
-                id=str(opp.id),
-                title=opp.title,
-                description=opp.description,
-                skills=[
-                    OpportunitySkillSchema(
-                        id=str(skill.id),
-                        skill_name=skill.skill.name,
-                        requirement_type=skill.requirement_type
-                    )
-                    for skill in opp.opportunity_skills.all()
-                ],
-                experiences=[
-                    OpportunityExperienceSchema(
-                        id=str(exp.id),
-                        description=exp.description
-                    )
-                    for exp in opp.opportunity_experiences.all()
-                ],
-                created_at=opp.created_at,
-                updated_at=opp.updated_at
-            )
-            for opp in opportunities
-        ]
-
-    return await build_response_data()
+    opportunities = _with_opportunity_details(org.opportunities.all())
+    return _stream_json_list(
+        _organisation_opportunity_from_model(opportunity)
+        async for opportunity in opportunities.aiterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
 
 
-@organisations_router.post("/managed/{organisation_slug}/opportunities/", response=OrganisationOpportunitySchema, tags=["Organisations"])
+@organisations_router.post("/managed/{organisation_slug}/opportunities/", response=OrganisationOpportunitySchema, auth=employer_auth, tags=["Organisations"])
 async def create_organisation_opportunity(request, organisation_slug: str, payload: OrganisationOpportunityCreateSchema):
     """Create a new opportunity for a managed organisation."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    org = await get_managed_organisation_or_404(request, organisation_slug, 'id', 'name')
 
     @sync_to_async
     def create_opportunity_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
+        # Resolve every requested skill in one query; unknown IDs are skipped.
+        # IDs are normalised to canonical UUID strings first, so any spelling
+        # Skill.objects.get() would accept (uppercase, no hyphens, braces) is
+        # found again in the lookup below.
+        skill_ids = [_canonical_uuid(skill_data.skill_id) for skill_data in payload.skills]
+        requested = dict.fromkeys(skill_id for skill_id in skill_ids if skill_id is not None)
+        skills = {str(skill.id): skill for skill in Skill.objects.filter(id__in=list(requested))}
+
+        with transaction.atomic():
             opportunity = Opportunity.objects.create(
                 title=payload.title,
                 description=payload.description,
                 organisation=org
             )
 
-            # Create opportunity skills
-            for skill_data in payload.skills:
-                try:
-                    skill = Skill.objects.get(id=skill_data.skill_id)
-                    OpportunitySkill.objects.create(
-                        opportunity=opportunity,
-                        skill=skill,
-                        requirement_type=skill_data.requirement_type
-                    )
-                except Skill.DoesNotExist:
-                    # Skip invalid skill IDs
-                    pass
-
-            return opportunity, None
-        except Organisation.DoesNotExist:
-            return None, "Organisation not found or access denied"
-
-    opportunity, error = await create_opportunity_sync()
-    if error:
-        raise HttpError(404, error)
-
-    @sync_to_async
-    def get_opportunity_skills():
-        return list(opportunity.opportunity_skills.select_related('skill').all())
-
-    skills_data = await get_opportunity_skills()
-
-    return OrganisationOpportunitySchema(
+            opp_skills = []
+            for skill_data, skill_id in zip(payload.skills, skill_ids):
+                skill = skills.pop(skill_id, None)
+                if skill is None:
+                    # Skip invalid or repeated skill IDs
+                    continue
+                opp_skill = OpportunitySkill(
+                    opportunity=opportunity,
+                    skill=skill,
+                    requirement_type=skill_data.requirement_type
+                )
+                # bulk_create() skips save(), so fill in the cached embedding text here
+                opp_skill.embedding_text = opp_skill.build_embedding_text()
+                opp_skills.append(opp_skill)
+            OpportunitySkill.objects.bulk_create(opp_skills)
+
+        return opportunity, opp_skills
+
+    opportunity, opp_skills = await create_opportunity_sync()
+
+    return _json_response(_ORGANISATION_OPPORTUNITY_ADAPTER, OrganisationOpportunitySchema.model_construct(
         id=str(opportunity.id),
         title=opportunity.title,
         description=opportunity.description,
         skills=[
-            OpportunitySkillSchema(
-                id=str(skill.id),
-                skill_name=skill.skill.name,
-                requirement_type=skill.requirement_type
+            OpportunitySkillSchema.model_construct(
+                id=str(opp_skill.id),
+                skill_name=opp_skill.skill.name,
+                requirement_type=opp_skill.requirement_type
             )
-            for skill in skills_data
+            for opp_skill in opp_skills
         ],
         experiences=[],
         created_at=opportunity.created_at,
         updated_at=opportunity.updated_at
-    )
+    ))
 
 
-@organisations_router.get("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=OrganisationOpportunitySchema, tags=["Organisations"])
+@organisations_router.get("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=OrganisationOpportunitySchema, auth=employer_auth, tags=["Organisations"])
 async def get_organisation_opportunity(request, organisation_slug: str, opportunity_id: str):
     """Get a specific opportunity for a managed organisation."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
-
-    @sync_to_async
-    def get_opportunity_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            opportunity = org.opportunities.prefetch_related('opportunity_skills__skill', 'opportunity_experiences').get(id=opportunity_id)
-            return opportunity, None
-        except (Organisation.DoesNotExist, Opportunity.DoesNotExist):
-            return None, "Organisation or opportunity not found or access denied"
-
-    opportunity, error = await get_opportunity_sync()
-    if error:
-        raise HttpError(404, error)
+    opportunity = await get_managed_opportunity_or_404(request, organisation_slug, opportunity_id)
 
-    @sync_to_async
-    def get_opportunity_data():
-        skills = list(opportunity.opportunity_skills.select_related('skill').all())
-        experiences = list(opportunity.opportunity_experiences.all())
-        return skills, experiences
+    return _json_response(_ORGANISATION_OPPORTUNITY_ADAPTER, _organisation_opportunity_from_model(opportunity))
 
-    skills_data, experiences_data = await get_opportunity_data()
 
-    return OrganisationOpportunitySchema(
-        id=str(opportunity.id),
-        title=opportunity.title,
-        description=opportunity.description,
-        skills=[
-            OpportunitySkillSchema(
-                id=str(skill.id),
-                skill_name=skill.skill.name,
-                requirement_type=skill.requirement_type
-            )
-            for skill in skills_data
-        ],
-        experiences=[
-            OpportunityExperienceSchema(
-                id=str(exp.id),
-                description=exp.description
-            )
-            for exp in experiences_data
-        ],
-        created_at=opportunity.created_at,
-        updated_at=opportunity.updated_at
-    )
-
-
-@organisations_router.put("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=OrganisationOpportunitySchema, tags=["Organisations"])
+@organisations_router.put("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=OrganisationOpportunitySchema, auth=employer_auth, tags=["Organisations"])
 async def update_organisation_opportunity(request, organisation_slug: str, opportunity_id: str, payload: OrganisationOpportunityUpdateSchema):
     """Update a specific opportunity for a managed organisation."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
+    opportunity = await get_managed_opportunity_or_404(request, organisation_slug, opportunity_id)
 
-    @sync_to_async
-    def update_opportunity_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            opportunity = org.opportunities.get(id=opportunity_id)
-            opportunity.title = payload.title
-            opportunity.description = payload.description
-            opportunity.save()
-            return opportunity, None
-        except (Organisation.DoesNotExist, Opportunity.DoesNotExist):
-            return None, "Organisation or opportunity not found or access denied"
-
-    opportunity, error = await update_opportunity_sync()
-    if error:
-        raise HttpError(404, error)
-
-    @sync_to_async
-    def get_opportunity_data():
-        skills = list(opportunity.opportunity_skills.select_related('skill').all())
-        experiences = list(opportunity.opportunity_experiences.all())
-        return skills, experiences
+    # Write only the columns that changed (not the stored embedding); an
+    # unchanged payload skips the UPDATE and the child embedding-text resets
+    changed = [field for field in ('title', 'description') if getattr(opportunity, field) != getattr(payload, field)]
+    if changed:
+        for field in changed:
+            setattr(opportunity, field, getattr(payload, field))
+        await opportunity.asave(update_fields=[*changed, 'updated_at'])
 
-    skills_data, experiences_data = await get_opportunity_data()
-
-    return OrganisationOpportunitySchema(
-        id=str(opportunity.id),
-        title=opportunity.title,
-        description=opportunity.description,
-        skills=[
-            OpportunitySkillSchema(
-                id=str(skill.id),
-                skill_name=skill.skill.name,
-                requirement_type=skill.requirement_type
-            )
-            for skill in skills_data
-        ],
-        experiences=[
-            OpportunityExperienceSchema(
-                id=str(exp.id),
-                description=exp.description
-            )
-            for exp in experiences_data
-        ],
-        created_at=opportunity.created_at,
-        updated_at=opportunity.updated_at
-    )
+    return _json_response(_ORGANISATION_OPPORTUNITY_ADAPTER, _organisation_opportunity_from_model(opportunity))
 
 
-@organisations_router.delete("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=dict, tags=["Organisations"])
+@organisations_router.delete("/managed/{organisation_slug}/opportunities/{opportunity_id}/", response=dict, auth=employer_auth, tags=["Organisations"])
 async def delete_organisation_opportunity(request, organisation_slug: str, opportunity_id: str):
     """Delete a specific opportunity for a managed organisation."""
-    user = await get_user_from_token(request)
-    await check_employer_permissions(user)
-
-    @sync_to_async
-    def delete_opportunity_sync():
-        try:
-            org = user.managed_organisations.get(slug=organisation_slug)
-            opportunity = org.opportunities.get(id=opportunity_id)
-            opportunity.delete()
-            return True, None
-        except (Organisation.DoesNotExist, Opportunity.DoesNotExist):
-            return False, "Organisation or opportunity not found or access denied"
-
-    success, error = await delete_opportunity_sync()
-    if error:
-        raise HttpError(404, error)
+    opportunities = managed_opportunities(request, organisation_slug)
+    deleted, _ = await opportunities.filter(id=opportunity_id).adelete()
+    if not deleted:
+        raise HttpError(404, "Organisation or opportunity not found or access denied")
 
     return {"success": True, "message": "Opportunity deleted successfully"}
 
@@ -562,27 +547,10 @@ async def delete_organisation_opportunity(request, organisation_slug: str, oppor
 @organisations_router.get("/{organisation_id}", response={200: OrganisationSchema, 404: dict}, tags=["Organisations"])
 async def get_organisation(request, organisation_id: str):
     """Get a specific organisation by ID."""
-    @sync_to_async
-    def get_organisation_sync():
-        try:
-            organisation = Organisation.objects.get(id=organisation_id)
-            return organisation, None
-        except Organisation.DoesNotExist:
-            return None, "Organisation not found"
-
-    organisation, error = await get_organisation_sync()
-    if error:
-        return 404, {"error": error}
-
-    return 200, OrganisationSchema(
-        id=str(organisation.id),
-        name=organisation.name,
-        slug=organisation.slug,
-        description=organisation.description,
-        website=organisation.website,
-        industry=organisation.industry,
-        created_at=organisation.created_at,
-        updated_at=organisation.updated_at
-    )
+    row = await _organisation_values(Organisation.objects.filter(id=organisation_id)).afirst()
+    if row is None:
+        return 404, {"error": "Organisation not found"}
+
+    return _json_response(_ORGANISATION_ROW_ADAPTER, row)
 
 
@@ -3,6 +3,7 @@ Factory Boy factories for organisations app.
 Used for testing and development data seeding.
 """
 
+from django.utils.text import slugify
 from factory.django import DjangoModelFactory
 from factory import Faker, Sequence
 from apps.organisations.models import Organisation
@@ -14,4 +15,18 @@ class OrganisationFactory(DjangoModelFactory):
     class Meta:
         model = Organisation
 
-    name = Sequence(lambda n: f"Test Organisation {n}")
\ No newline at end of file
+    name = Sequence(lambda n: f"Test Organisation {n}")
+
+    @classmethod
+    def create_batch(cls, size, **kwargs):
+        """
+        Insert the whole batch with one bulk_create().
+
+        bulk_create() skips Organisation.save(), so slugs are filled in from the
+        names here; the sequence keeps default names (and so slugs) unique.
+        """
+        organisations = cls.build_batch(size, **kwargs)
+        for organisation in organisations:
+            if not organisation.slug:
+                organisation.slug = slugify(organisation.name)
+        return Organisation.objects.bulk_create(organisations)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:00
+
+import django.contrib.postgres.functions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organisations', '0007_organisation_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='organisation',
+            name='id',
+            field=models.UUIDField(db_default=django.contrib.postgres.functions.RandomUUID(), editable=False, primary_key=True, serialize=False),
+        ),
+    ]
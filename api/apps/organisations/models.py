@@ -1,10 +1,66 @@
-from django.db import models
+from django.contrib.postgres.functions import RandomUUID
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Upper
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils.text import slugify
+import threading
+import time
 import uuid
 
 
+# Per-process name -> id cache for get_or_create_organisation_id(). Agents
+# reuse the same company across many tool calls; entries expire after a
+# minute and are dropped when the organisation is saved or deleted in this
+# process. Deletes in other processes are caught by callers through
+# forget_organisation_name() when the stale id fails its foreign key check.
+ORGANISATION_ID_CACHE_TTL = 60
+ORGANISATION_ID_CACHE_MAX = 1024
+_organisation_ids = {}
+_organisation_ids_lock = threading.Lock()
+
+
+def _forget_organisation_id(organisation_id) -> None:
+    with _organisation_ids_lock:
+        for name in [name for name, (org_id, _) in _organisation_ids.items() if org_id == organisation_id]:
+            del _organisation_ids[name]
+
+
+def forget_organisation_name(name: str) -> None:
+    """Drop the cached id for ``name``, e.g. after it turned out to be stale."""
+    with _organisation_ids_lock:
+        _organisation_ids.pop(name, None)
+
+
+def _remember_organisation_id(name: str, organisation_id) -> None:
+    with _organisation_ids_lock:
+        if len(_organisation_ids) >= ORGANISATION_ID_CACHE_MAX:
+            _organisation_ids.pop(next(iter(_organisation_ids)))
+        _organisation_ids[name] = (organisation_id, time.monotonic() + ORGANISATION_ID_CACHE_TTL)
+
+
+def get_or_create_organisation_id(name: str) -> uuid.UUID:
+    """
+    Return the id of the organisation called ``name``, creating it if needed.
+
+    Repeat lookups within the TTL skip the database. New entries are cached
+    only once the surrounding transaction commits, so a rollback never leaves
+    an id for a row that does not exist.
+    """
+    with _organisation_ids_lock:
+        cached = _organisation_ids.get(name)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    organisation, _ = Organisation.objects.get_or_create(name=name)
+    transaction.on_commit(lambda: _remember_organisation_id(name, organisation.pk))
+    return organisation.pk
+
+
 class Organisation(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Generated by Postgres (gen_random_uuid()) and read back from RETURNING
+    id = models.UUIDField(primary_key=True, db_default=RandomUUID(), editable=False)
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True, blank=True)  # URL-friendly identifier
 
@@ -16,16 +72,46 @@ class Organisation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Trigram index for name__icontains (UPPER(name) LIKE ...)
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='org_name_trgm'),
+        ]
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-            # Handle duplicates
-            original_slug = self.slug
-            counter = 1
-            while Organisation.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            self.slug = self._free_slug()
+            try:
+                # Savepoint, so losing the race below leaves the caller's
+                # transaction usable
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except IntegrityError:
+                # Another writer took the slug between the lookup and the insert
+                self.slug = self._free_slug()
+                super().save(*args, **kwargs)
+        # The name may have changed
+        _forget_organisation_id(self.pk)
+
+    def _free_slug(self):
+        """slugify(name), suffixed -1, -2, ... past the slugs already taken, in one query."""
+        base = slugify(self.name)
+        taken = set(
+            Organisation.objects.filter(slug__startswith=base).exclude(pk=self.pk).values_list('slug', flat=True)
+        )
+        slug, counter = base, 1
+        while slug in taken:
+            slug = f"{base}-{counter}"
+            counter += 1
+        return slug
 
     def __str__(self):
         return self.name
+
+
+@receiver(post_delete, sender=Organisation)
+def _forget_deleted_organisation(sender, instance, **kwargs):
+    # Also fires for queryset deletes and cascades, which skip Model.delete()
+    _forget_organisation_id(instance.pk)
@@ -2,10 +2,17 @@
 Tests for organisations app API endpoints.
 """
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.test import TestCase
 from ninja.testing import TestClient
 from apps.organisations.api import organisations_router
 from apps.organisations.models import Organisation
+from apps.skills.models import Skill
+import jwt
+
+User = get_user_model()
 
 
 class OrganisationsAPITest(TestCase):
@@ -106,3 +113,40 @@ class OrganisationsAPITest(TestCase):
         # Verify we now have 2 organisations with the same name
         orgs_with_name = Organisation.objects.filter(name="Duplicate Org")
         self.assertEqual(orgs_with_name.count(), 2)
+
+
+class ManagedOpportunitiesAPITest(TestCase):
+    """Test opportunity endpoints for employer-managed organisations."""
+
+    def setUp(self):
+        self.client = TestClient(organisations_router)
+        self.user = User.objects.create_user(username="employer@example.com", email="employer@example.com", password="password123")
+        self.user.groups.add(Group.objects.get_or_create(name="employer")[0])
+        self.organisation = Organisation.objects.create(name="Managed Org")
+        self.organisation.managers.add(self.user)
+        token = jwt.encode({'user_id': self.user.id, 'exp': 9999999999}, settings.SECRET_KEY, algorithm='HS256')
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def test_create_opportunity_accepts_any_uuid_spelling(self):
+        """Skill IDs match whatever their case or hyphenation."""
+        python = Skill.objects.create(name="Python")
+        django = Skill.objects.create(name="Django")
+
+        response = self.client.post(
+            f"/managed/{self.organisation.slug}/opportunities/",
+            json={
+                "title": "Backend Engineer",
+                "description": "Build APIs",
+                "skills": [
+                    {"skill_id": str(python.id).upper(), "requirement_type": "required"},
+                    {"skill_id": python.id.hex, "requirement_type": "required"},
+                    {"skill_id": str(django.id), "requirement_type": "preferred"},
+                    {"skill_id": "not-a-uuid", "requirement_type": "preferred"},
+                ],
+            },
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        skills = {skill["skill_name"]: skill["requirement_type"] for skill in response.json()["skills"]}
+        self.assertEqual(skills, {"Python": "required", "Django": "preferred"})
@@ -3,7 +3,9 @@ Tests for organisations app models.
 """
 
 from django.test import TestCase
-from apps.organisations.models import Organisation
+from django.utils.text import slugify
+from apps.organisations.factories import OrganisationFactory
+from apps.organisations.models import Organisation, get_or_create_organisation_id
 
 
 class OrganisationModelTest(TestCase):
@@ -19,3 +21,40 @@ class OrganisationModelTest(TestCase):
         )
         self.assertEqual(org.name, "Test Organisation")
         self.assertEqual(str(org), "Test Organisation")
+
+    def test_get_or_create_organisation_id_is_cached(self):
+        """Known names resolve without a query; renaming drops the cached id."""
+        with self.captureOnCommitCallbacks(execute=True):
+            org_id = get_or_create_organisation_id("Cached Org")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_or_create_organisation_id("Cached Org"), org_id)
+
+        org = Organisation.objects.get(pk=org_id)
+        org.name = "Renamed Org"
+        org.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertNotEqual(get_or_create_organisation_id("Cached Org"), org_id)
+
+    def test_queryset_delete_drops_cached_id(self):
+        """Deletes that bypass Organisation.delete() still evict the cached id."""
+        with self.captureOnCommitCallbacks(execute=True):
+            org_id = get_or_create_organisation_id("Doomed Org")
+
+        Organisation.objects.filter(pk=org_id).delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertNotEqual(get_or_create_organisation_id("Doomed Org"), org_id)
+
+    def test_duplicate_names_get_suffixed_slugs(self):
+        """Each organisation with a repeated name gets the next free slug suffix."""
+        slugs = [Organisation.objects.create(name="Acme").slug for _ in range(3)]
+        self.assertEqual(slugs, ["acme", "acme-1", "acme-2"])
+
+    def test_factory_batch_is_one_insert(self):
+        """create_batch() inserts every organisation, with slugs, in one query."""
+        with self.assertNumQueries(1):
+            organisations = OrganisationFactory.create_batch(5)
+        self.assertEqual(Organisation.objects.filter(pk__in=[org.pk for org in organisations]).count(), 5)
+        self.assertTrue(all(org.slug == slugify(org.name) for org in organisations))
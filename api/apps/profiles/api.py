@@ -3,22 +3,54 @@ API endpoints for profiles app using Django Ninja.
 """
 
 from ninja import Router, Schema
+from pydantic import TypeAdapter
 from typing import List, Optional
 from asgiref.sync import sync_to_async
 from apps.profiles.models import Profile, ProfileSkill, ProfileExperience, ProfileExperienceSkill
 from apps.skills.models import Skill
+from apps.accounts.utils import bearer_token, verify_token
 from apps.organisations.models import Organisation
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch, TextField, prefetch_related_objects
+from django.db.models.functions import Cast
+from django.http import HttpResponse
+from django.db import connection
+from django.utils import timezone
 import jwt
-from django.conf import settings
-
-# JWT settings (same as accounts API)
-JWT_SECRET_KEY = settings.SECRET_KEY
-JWT_ALGORITHM = 'HS256'
+import uuid
 
 # Create router for profiles endpoints
 profiles_router = Router()
 
+# User columns the profile endpoints read
+_USER_FIELDS = ('id', 'email', 'first_name', 'last_name', 'username')
+
+
+async def get_user_from_token(request):
+    """
+    Resolve the request's bearer token to a User.
+
+    The token is verified through the shared, cached verify_token(), so only
+    the user lookup (limited to _USER_FIELDS) runs on each request. Returns
+    ``(user, None)`` on success or ``(None, error)`` with the message for a
+    401 response.
+    """
+    token = bearer_token(request)
+    if token is None:
+        return None, "No token provided"
+
+    try:
+        user_id = await verify_token(token)
+    except jwt.ExpiredSignatureError:
+        return None, "Token expired"
+    except jwt.InvalidTokenError:
+        return None, "Invalid token"
+
+    user = await get_user_model().objects.only(*_USER_FIELDS).filter(id=user_id).afirst()
+    if user is None:
+        return None, "User not found"
+    return user, None
+
 
 class ProfileSchema(Schema):
     """Schema for Profile model."""
@@ -34,6 +66,14 @@ class ProfileSchema(Schema):
     experiences: Optional[List["ExperienceSchema"]] = None
 
 
+class ProfileSummarySchema(Schema):
+    """Identity fields of a profile, as returned by the public profile endpoints."""
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+
+
 class ExperienceSchema(Schema):
     """Schema for ProfileExperience model (read)."""
     id: str
@@ -45,6 +85,79 @@ class ExperienceSchema(Schema):
     skills: List[str] = []  # Skills demonstrated in this experience
 
 
+# Cached adapter for list responses, built once at import
+_PROFILE_LIST_ADAPTER = TypeAdapter(List[ProfileSummarySchema])
+
+
+def _serialize_profile_summary(profile: Profile) -> ProfileSummarySchema:
+    """Identity fields only, for the public profile endpoints."""
+    return ProfileSummarySchema.model_construct(
+        id=str(profile.id),
+        first_name=profile.first_name,
+        last_name=profile.last_name,
+        email=profile.email
+    )
+
+
+def _serialize_profile(profile: Profile, skills: List[str], experiences: List[ExperienceSchema]) -> ProfileSchema:
+    """Full profile, as returned to its owner."""
+    return ProfileSchema.model_construct(
+        id=str(profile.id),
+        full_name=f"{profile.first_name} {profile.last_name}".strip(),
+        email=profile.email,
+        bio=profile.bio,
+        city=profile.city,
+        country=profile.country,
+        first_name=profile.first_name,
+        last_name=profile.last_name,
+        skills=skills,
+        experiences=experiences,
+    )
+
+
+def _profile_detail_prefetches():
+    """
+    Prefetches for _serialize_profile_details(): skills, and experiences newest
+    first with their organisation and skills; three queries per batch of profiles.
+    """
+    return (
+        Prefetch('profile_skills', queryset=ProfileSkill.objects.select_related('skill')),
+        Prefetch(
+            'profile_experiences',
+            queryset=ProfileExperience.objects.select_related('organisation').prefetch_related(
+                'profile_experience_skills__skill'
+            ).order_by('-start_date'),
+        ),
+    )
+
+
+def _serialize_profile_details(profile: Profile) -> ProfileSchema:
+    """Full profile from a profile loaded with _profile_detail_prefetches()."""
+    return _serialize_profile(
+        profile,
+        [profile_skill.skill.name for profile_skill in profile.profile_skills.all()],
+        [_serialize_experience(exp, _experience_skill_names(exp)) for exp in profile.profile_experiences.all()],
+    )
+
+
+def _experience_skill_names(exp: ProfileExperience) -> List[str]:
+    """Skill names from a prefetched profile_experience_skills__skill."""
+    return [experience_skill.skill.name for experience_skill in exp.profile_experience_skills.all()]
+
+
+def _serialize_experience(exp: ProfileExperience, skills: List[str]) -> ExperienceSchema:
+    """ExperienceSchema for an experience whose organisation is loaded."""
+    return ExperienceSchema.model_construct(
+        id=str(exp.id),
+        title=exp.title,
+        company=exp.organisation.name,
+        description=exp.description or None,
+        start_date=exp.start_date.isoformat(),
+        end_date=exp.end_date.isoformat() if exp.end_date else None,
+        skills=skills,
+    )
+
+
 class ProfileCreateSchema(Schema):
     """Schema for creating a Profile."""
     first_name: str
@@ -52,126 +165,83 @@ class ProfileCreateSchema(Schema):
     email: str
 
 
+# Profile fields the owner can edit; None in the payload leaves a field as it is
+_PROFILE_EDITABLE_FIELDS = ('first_name', 'last_name', 'bio', 'city', 'country')
+
+
+def _upsert_profile(user, payload: ProfileSchema) -> Profile:
+    """
+    Create the user's profile, or update the fields set in the payload, in one
+    INSERT ... ON CONFLICT (user_id) DO UPDATE ... RETURNING statement.
+
+    A new profile falls back to the user's names. The email always follows the
+    user's, as in Profile.save().
+    """
+    now = timezone.now()
+    insert = {
+        'id': uuid.uuid4(),
+        'user_id': user.pk,
+        'email': user.email,
+        'first_name': payload.first_name or user.first_name or '',
+        'last_name': payload.last_name or user.last_name or '',
+        'bio': payload.bio,
+        'city': payload.city,
+        'country': payload.country,
+        'created_at': now,
+        'updated_at': now,
+    }
+    update = {
+        'email': user.email,
+        'updated_at': now,
+        **{name: getattr(payload, name) for name in _PROFILE_EDITABLE_FIELDS if getattr(payload, name) is not None},
+    }
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(Profile._meta.db_table)} ({', '.join(map(quote, insert))}) "
+        f"VALUES ({', '.join(['%s'] * len(insert))}) "
+        f"ON CONFLICT ({quote(Profile._meta.get_field('user').column)}) DO UPDATE SET "
+        f"{', '.join(f'{quote(column)} = %s' for column in update)} "
+        f"RETURNING *"
+    )
+    return next(iter(Profile.objects.raw(sql, [*insert.values(), *update.values()])))
+
+
 @profiles_router.get("/my", response={200: ProfileSchema, 401: dict}, tags=["Profiles"])
 async def get_my_profile(request):
     """Get current user's profile."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     # Set request.user for session functions
     request.user = user
 
-    @sync_to_async
-    def get_profile_sync():
-        try:
-            profile = Profile.objects.get(user=user)
-            # Get skills from ProfileSkill relationships
-            skills = list(profile.profile_skills.values_list('skill__name', flat=True))
-            # Get experiences (ordered by start_date desc) with skills
-            experiences = []
-            for exp in profile.profile_experiences.select_related('organisation').prefetch_related('profile_experience_skills__skill').all().order_by('-start_date'):
-                exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-                experiences.append(ExperienceSchema(
-                    id=str(exp.id),
-                    title=exp.title,
-                    company=exp.organisation.name,
-                    description=exp.description or None,
-                    start_date=exp.start_date.isoformat(),
-                    end_date=exp.end_date.isoformat() if exp.end_date else None,
-                    skills=exp_skills,
-                ))
-
-            return ProfileSchema(
-                id=str(profile.id),
-                full_name=f"{profile.first_name} {profile.last_name}".strip(),
-                email=profile.email,
-                bio=profile.bio,
-                city=profile.city,
-                country=profile.country,
-                first_name=profile.first_name,
-                last_name=profile.last_name,
-                skills=skills,
-                experiences=experiences,
-            ), None
-        except Profile.DoesNotExist:
-            # Return profile data from user model if no profile exists
-            return ProfileSchema(
-                full_name=f"{user.first_name} {user.last_name}".strip() or user.username,
-                email=user.email,
-                skills=[],
-                experiences=[],
-            ), None
-
-    profile_data, error = await get_profile_sync()
-    return profile_data
+    profile = await Profile.objects.prefetch_related(*_profile_detail_prefetches()).filter(user=user).afirst()
+    if profile is None:
+        # Return profile data from user model if no profile exists
+        return ProfileSchema(
+            full_name=f"{user.first_name} {user.last_name}".strip() or user.username,
+            email=user.email,
+            skills=[],
+            experiences=[],
+        )
+
+    return _serialize_profile_details(profile)
 
 
 @profiles_router.post("/my", response=ProfileSchema, tags=["Profiles"])
 async def update_my_profile(request, payload: ProfileSchema):
     """Update current user's profile."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     # Set request.user for session functions
     request.user = user
 
     @sync_to_async
     def update_profile_sync():
-        profile, created = Profile.objects.get_or_create(
-            user=user,
-            defaults={
-                'email': user.email,
-                'first_name': payload.first_name or user.first_name or '',
-                'last_name': payload.last_name or user.last_name or '',
-                'bio': payload.bio,
-                'city': payload.city,
-                'country': payload.country,
-            }
-        )
-
-        if not created:
-            # Update existing profile
-            if payload.first_name is not None:
-                profile.first_name = payload.first_name
-            if payload.last_name is not None:
-                profile.last_name = payload.last_name
-            if payload.bio is not None:
-                profile.bio = payload.bio
-            if payload.city is not None:
-                profile.city = payload.city
-            if payload.country is not None:
-                profile.country = payload.country
-            profile.save()
+        profile = _upsert_profile(user, payload)
 
         # Handle skills
         if payload.skills is not None:
@@ -197,100 +267,53 @@ async def update_my_profile(request, payload: ProfileSchema):
                 except Skill.DoesNotExist:
                     pass  # Skill doesn't exist, nothing to remove
 
-        # Get updated skills list
-        skills = list(profile.profile_skills.values_list('skill__name', flat=True))
-
-        # Get updated experiences list with skills
-        experiences = []
-        for exp in profile.profile_experiences.select_related('organisation').prefetch_related('profile_experience_skills__skill').all().order_by('-start_date'):
-            exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-            experiences.append(ExperienceSchema(
-                id=str(exp.id),
-                title=exp.title,
-                company=exp.organisation.name,
-                description=exp.description or None,
-                start_date=exp.start_date.isoformat(),
-                end_date=exp.end_date.isoformat() if exp.end_date else None,
-                skills=exp_skills,
-            ))
-
-        return ProfileSchema(
-            id=str(profile.id),
-            full_name=f"{profile.first_name} {profile.last_name}".strip(),
-            email=profile.email,
-            bio=profile.bio,
-            city=profile.city,
-            country=profile.country,
-            skills=skills,
-            first_name=profile.first_name,
-            last_name=profile.last_name,
-            experiences=experiences,
-        )
+        # Load the updated skills and experiences
+        prefetch_related_objects([profile], *_profile_detail_prefetches())
+        return _serialize_profile_details(profile)
 
     profile_data = await update_profile_sync()
     return profile_data
 
 
-@profiles_router.get("/", response=List[ProfileSchema], tags=["Profiles"])
+@profiles_router.get("/", response=List[ProfileSummarySchema], tags=["Profiles"])
 async def list_profiles(request):
     """List all profiles."""
-    @sync_to_async
-    def get_profiles_sync():
-        return list(Profile.objects.all())
-
-    profiles = await get_profiles_sync()
-    return [
-        ProfileSchema(
-            id=str(profile.id),
-            first_name=profile.first_name,
-            last_name=profile.last_name,
-            email=profile.email
+    # Plain rows straight into unvalidated schemas, dumped by the cached adapter
+    # (this skips Ninja's response validation and renderer)
+    profiles = [
+        ProfileSummarySchema.model_construct(
+            id=row['id_str'],
+            first_name=row['first_name'],
+            last_name=row['last_name'],
+            email=row['email']
+        )
+        async for row in Profile.objects.values(
+            'first_name', 'last_name', 'email', id_str=Cast('id', output_field=TextField())
         )
-        for profile in profiles
     ]
+    return HttpResponse(_PROFILE_LIST_ADAPTER.dump_json(profiles), content_type="application/json")
 
 
-@profiles_router.post("/", response=ProfileSchema, tags=["Profiles"])
+@profiles_router.post("/", response=ProfileSummarySchema, tags=["Profiles"])
 async def create_profile(request, payload: ProfileCreateSchema):
     """Create a new profile."""
-    @sync_to_async
-    def create_profile_sync():
-        return Profile.objects.create(
-            first_name=payload.first_name,
-            last_name=payload.last_name,
-            email=payload.email
-        )
-
-    profile = await create_profile_sync()
-    return ProfileSchema(
-        id=str(profile.id),
-        first_name=profile.first_name,
-        last_name=profile.last_name,
-        email=profile.email
+    profile = await Profile.objects.acreate(
+        first_name=payload.first_name,
+        last_name=payload.last_name,
+        email=payload.email
     )
+    return _serialize_profile_summary(profile)
 
 
-@profiles_router.get("/{profile_id}", response={200: ProfileSchema, 404: dict}, tags=["Profiles"])
+@profiles_router.get("/{profile_id}", response={200: ProfileSummarySchema, 404: dict}, tags=["Profiles"])
 async def get_profile(request, profile_id: str):
     """Get a specific profile by ID."""
-    @sync_to_async
-    def get_profile_sync():
-        try:
-            profile = Profile.objects.get(id=profile_id)
-            return profile, None
-        except Profile.DoesNotExist:
-            return None, "Profile not found"
-
-    profile, error = await get_profile_sync()
-    if error:
-        return 404, {"error": error}
+    try:
+        profile = await Profile.objects.aget(id=profile_id)
+    except Profile.DoesNotExist:
+        return 404, {"error": "Profile not found"}
 
-    return 200, ProfileSchema(
-        id=str(profile.id),
-        first_name=profile.first_name,
-        last_name=profile.last_name,
-        email=profile.email
-    )
+    return 200, _serialize_profile_summary(profile)
 
 
 # ==============================
@@ -326,23 +349,9 @@ def _parse_iso_date(value: Optional[str]):
 @profiles_router.get("/my/experiences", response={200: List[ExperienceSchema], 401: dict}, tags=["Profiles"])
 async def list_my_experiences(request):
     """List current user's experiences."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     @sync_to_async
     def fetch_experiences():
@@ -352,16 +361,7 @@ async def list_my_experiences(request):
             return []
         items = []
         for exp in profile.profile_experiences.select_related('organisation').prefetch_related('profile_experience_skills__skill').all().order_by('-start_date'):
-            exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-            items.append(ExperienceSchema(
-                id=str(exp.id),
-                title=exp.title,
-                company=exp.organisation.name,
-                description=exp.description or None,
-                start_date=exp.start_date.isoformat(),
-                end_date=exp.end_date.isoformat() if exp.end_date else None,
-                skills=exp_skills,
-            ))
+            items.append(_serialize_experience(exp, _experience_skill_names(exp)))
         return items
 
     items = await fetch_experiences()
@@ -371,23 +371,9 @@ async def list_my_experiences(request):
 @profiles_router.post("/my/experiences", response={201: ExperienceSchema, 400: dict, 401: dict}, tags=["Profiles"])
 async def create_my_experience(request, payload: ExperienceCreateSchema):
     """Create a new experience for the current user."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     @sync_to_async
     def create_exp_sync():
@@ -417,15 +403,7 @@ async def create_my_experience(request, payload: ExperienceCreateSchema):
         except Exception:
             pass
 
-        return ExperienceSchema(
-            id=str(exp.id),
-            title=exp.title,
-            company=organisation.name,
-            description=exp.description or None,
-            start_date=exp.start_date.isoformat(),
-            end_date=exp.end_date.isoformat() if exp.end_date else None,
-            skills=[],  # New experience starts with no skills
-        )
+        return _serialize_experience(exp, [])
 
     try:
         result = await create_exp_sync()
@@ -437,23 +415,9 @@ async def create_my_experience(request, payload: ExperienceCreateSchema):
 @profiles_router.patch("/my/experiences/{experience_id}", response={200: ExperienceSchema, 400: dict, 401: dict, 404: dict}, tags=["Profiles"])
 async def update_my_experience(request, experience_id: str, payload: ExperienceUpdateSchema):
     """Update an existing experience for the current user."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     @sync_to_async
     def update_exp_sync():
@@ -501,15 +465,7 @@ async def update_my_experience(request, experience_id: str, payload: ExperienceU
         # Get updated skills for the experience
         exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
 
-        return ExperienceSchema(
-            id=str(exp.id),
-            title=exp.title,
-            company=exp.organisation.name,
-            description=exp.description or None,
-            start_date=exp.start_date.isoformat(),
-            end_date=exp.end_date.isoformat() if exp.end_date else None,
-            skills=exp_skills,
-        ), 200, None
+        return _serialize_experience(exp, exp_skills), 200, None
 
     result, status_code, error = await update_exp_sync()
     if error:
@@ -520,42 +476,21 @@ async def update_my_experience(request, experience_id: str, payload: ExperienceU
 @profiles_router.delete("/my/experiences/{experience_id}", response={204: None, 401: dict, 404: dict}, tags=["Profiles"])
 async def delete_my_experience(request, experience_id: str):
     """Delete an experience for the current user."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
-
-    @sync_to_async
-    def delete_exp_sync():
-        try:
-            profile = Profile.objects.get(user=user)
-        except Profile.DoesNotExist:
-            return 404, {"error": "Profile not found"}
-
-        try:
-            exp = ProfileExperience.objects.get(id=experience_id, profile=profile)
-        except ProfileExperience.DoesNotExist:
-            return 404, {"error": "Experience not found"}
+        profile = await Profile.objects.aget(user=user)
+    except Profile.DoesNotExist:
+        return 404, {"error": "Profile not found"}
 
-        exp.delete()
-        return 204, None
+    try:
+        exp = await ProfileExperience.objects.aget(id=experience_id, profile=profile)
+    except ProfileExperience.DoesNotExist:
+        return 404, {"error": "Experience not found"}
 
-    status_code, error = await delete_exp_sync()
-    if error:
-        return status_code, error
+    await exp.adelete()
     return 204, None
 
 
@@ -570,65 +505,29 @@ class ExperienceSkillCreateSchema(Schema):
 @profiles_router.get("/my/experiences/{experience_id}/skills", response={200: List[str], 401: dict, 404: dict}, tags=["Profiles"])
 async def list_experience_skills(request, experience_id: str):
     """List skills for a specific experience."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
-
-    @sync_to_async
-    def get_skills():
-        try:
-            profile = Profile.objects.get(user=user)
-        except Profile.DoesNotExist:
-            return None, 404, {"error": "Profile not found"}
+        profile = await Profile.objects.aget(user=user)
+    except Profile.DoesNotExist:
+        return 404, {"error": "Profile not found"}
 
-        try:
-            exp = ProfileExperience.objects.select_related('profile').get(id=experience_id, profile=profile)
-        except ProfileExperience.DoesNotExist:
-            return None, 404, {"error": "Experience not found"}
-
-        skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-        return skills, 200, None
+    try:
+        exp = await ProfileExperience.objects.only('id').aget(id=experience_id, profile=profile)
+    except ProfileExperience.DoesNotExist:
+        return 404, {"error": "Experience not found"}
 
-    result, status_code, error = await get_skills()
-    if error:
-        return status_code, error
-    return result
+    return [name async for name in exp.profile_experience_skills.values_list('skill__name', flat=True)]
 
 
 @profiles_router.post("/my/experiences/{experience_id}/skills", response={200: ExperienceSchema, 400: dict, 401: dict, 404: dict}, tags=["Profiles"])
 async def add_experience_skills(request, experience_id: str, payload: ExperienceSkillCreateSchema):
     """Add skills to a specific experience."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     @sync_to_async
     def add_skills_sync():
@@ -680,15 +579,7 @@ async def add_experience_skills(request, experience_id: str, payload: Experience
 
         # Return updated experience with all skills
         exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-        return ExperienceSchema(
-            id=str(exp.id),
-            title=exp.title,
-            company=exp.organisation.name,
-            description=exp.description or None,
-            start_date=exp.start_date.isoformat(),
-            end_date=exp.end_date.isoformat() if exp.end_date else None,
-            skills=exp_skills,
-        ), 200, None
+        return _serialize_experience(exp, exp_skills), 200, None
 
     result, status_code, error = await add_skills_sync()
     if error:
@@ -699,23 +590,9 @@ async def add_experience_skills(request, experience_id: str, payload: Experience
 @profiles_router.delete("/my/experiences/{experience_id}/skills/{skill_name}", response={200: ExperienceSchema, 401: dict, 404: dict}, tags=["Profiles"])
 async def remove_experience_skill(request, experience_id: str, skill_name: str):
     """Remove a skill from a specific experience."""
-    # Extract and validate JWT token
-    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-    if not auth_header.startswith('Bearer '):
-        return 401, {"error": "No token provided"}
-
-    token = auth_header.split(' ')[1]
-
-    try:
-        jwt_payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        User = get_user_model()
-        user = await sync_to_async(User.objects.get)(id=jwt_payload['user_id'])
-    except jwt.ExpiredSignatureError:
-        return 401, {"error": "Token expired"}
-    except jwt.InvalidTokenError:
-        return 401, {"error": "Invalid token"}
-    except User.DoesNotExist:
-        return 401, {"error": "User not found"}
+    user, error = await get_user_from_token(request)
+    if error:
+        return 401, {"error": error}
 
     @sync_to_async
     def remove_skill_sync():
@@ -745,15 +622,7 @@ async def remove_experience_skill(request, experience_id: str, skill_name: str):
 
         # Return updated experience with remaining skills
         exp_skills = list(exp.profile_experience_skills.values_list('skill__name', flat=True))
-        return ExperienceSchema(
-            id=str(exp.id),
-            title=exp.title,
-            company=exp.organisation.name,
-            description=exp.description or None,
-            start_date=exp.start_date.isoformat(),
-            end_date=exp.end_date.isoformat() if exp.end_date else None,
-            skills=exp_skills,
-        ), 200, None
+        return _serialize_experience(exp, exp_skills), 200, None
 
     result, status_code, error = await remove_skill_sync()
     if error:
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
 from pgvector.django import VectorField
 from apps.organisations.models import Organisation
@@ -22,6 +24,15 @@ class Profile(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Trigram indexes for the first/last name and email__icontains profile
+            # search (UPPER(field) LIKE ...); email equality uses the unique index
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='profile_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='profile_last_name_trgm'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='profile_email_trgm'),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
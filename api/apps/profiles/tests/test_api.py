@@ -430,6 +430,60 @@ class ProfilesAPITest(TestCase):
         self.assertIn("skills", exp_data)
         self.assertIsInstance(exp_data["skills"], list)
 
+    def test_get_my_profile_query_budget(self):
+        """GET /my loads skills and every experience's skills without per-experience queries."""
+        from apps.profiles.models import ProfileSkill, ProfileExperienceSkill
+        from apps.skills.models import Skill
+
+        user, profile = self._create_test_user_and_profile()
+        org = Organisation.objects.create(name="Budget Co")
+        skills = [Skill.objects.create(name=f"Skill {i}") for i in range(3)]
+        for skill in skills:
+            ProfileSkill.objects.create(profile=profile, skill=skill)
+        for i in range(4):
+            exp = ProfileExperience.objects.create(
+                profile=profile, organisation=org, title=f"Role {i}", start_date=f"202{i}-01-01"
+            )
+            for skill in skills:
+                ProfileExperienceSkill.objects.create(profile_experience=exp, skill=skill)
+
+        client = TestClient(profiles_router)
+        token = self._create_jwt_token(user)
+
+        # User (token cache miss) + profile + skills + experiences + experience skills
+        with self.assertNumQueries(5):
+            response = client.get("/my", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(sorted(data["skills"]), ["Skill 0", "Skill 1", "Skill 2"])
+        self.assertEqual([exp["title"] for exp in data["experiences"]], ["Role 3", "Role 2", "Role 1", "Role 0"])
+        self.assertTrue(all(len(exp["skills"]) == 3 for exp in data["experiences"]))
+
+    def test_update_my_profile_creates_then_updates(self):
+        """POST /my creates the profile, then updates only the fields sent."""
+        user = User.objects.create_user(
+            username="new@example.com",
+            email="new@example.com",
+            password="password123",
+            first_name="New",
+            last_name="User"
+        )
+        client = TestClient(profiles_router)
+        headers = {"Authorization": f"Bearer {self._create_jwt_token(user)}"}
+
+        response = client.post("/my", json={"bio": "Hello"}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        profile = Profile.objects.get(user=user)
+        self.assertEqual((profile.first_name, profile.last_name, profile.bio), ("New", "User", "Hello"))
+
+        response = client.post("/my", json={"city": "London", "first_name": "Renamed"}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(profile.id))
+        self.assertEqual(response.json()["bio"], "Hello")
+        profile.refresh_from_db()
+        self.assertEqual((profile.first_name, profile.bio, profile.city), ("Renamed", "Hello", "London"))
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+
     def test_list_experience_skills(self):
         """Test listing skills for a specific experience."""
         user, profile = self._create_test_user_and_profile()
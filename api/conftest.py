@@ -3,5 +3,5 @@ import django
 from django.conf import settings
 
 def pytest_configure():
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yeshuman.settings')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yeshuman.settings_test')
     django.setup()
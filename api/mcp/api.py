@@ -5,6 +5,7 @@ from ninja import NinjaAPI, Schema
 from .server import mcp_server, MCPRequest
 from django.http import StreamingHttpResponse
 from utils.sse import SSEHttpResponse
+from utils.renderers import ORJSONRenderer
 import json
 import sys
 
@@ -13,7 +14,8 @@ mcp_api = NinjaAPI(
     title="Yes Human MCP Server",
     version="1.0.0",
     description="Model Context Protocol server for Yes Human tools",
-    urls_namespace="mcp"
+    urls_namespace="mcp",
+    renderer=ORJSONRenderer()
 )
 
 
@@ -0,0 +1,28 @@
+"""
+Tests for the orjson-backed Ninja renderer.
+"""
+import datetime
+import json
+import uuid
+
+from django.test import SimpleTestCase
+from ninja.renderers import JSONRenderer
+
+from utils.renderers import ORJSONRenderer
+
+
+class TestORJSONRenderer(SimpleTestCase):
+    """ORJSONRenderer output matches Ninja's stdlib renderer."""
+
+    def test_matches_ninja_wire_format(self):
+        data = {
+            "id": uuid.uuid4(),
+            "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc),
+            "date": datetime.date(2025, 1, 2),
+            "time": datetime.time(3, 4, 5, 123456),
+            "items": [1, "two", None],
+        }
+        rendered = ORJSONRenderer().render(None, data, response_status=200)
+        expected = JSONRenderer().render(None, data, response_status=200)
+        self.assertEqual(json.loads(rendered), json.loads(expected))
+        self.assertEqual(json.loads(rendered)["created_at"], "2025-01-02T03:04:05.123Z")
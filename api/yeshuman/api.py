@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 from agent.graph import ainvoke_agent, ainvoke_agent_sync, astream_agent_tokens, create_agent
 from apps.accounts.api import auth_router
+from apps.accounts.utils import bearer_token, verify_token
 from apps.profiles.api import profiles_router
 from apps.organisations.api import organisations_router
 from apps.skills.api import skills_router
@@ -17,6 +18,7 @@ from apps.applications.api import applications_router
 from apps.memories.api import memories_router
 from apps.feedback.api import feedback_router
 from utils.sse import SSEHttpResponse
+from utils.renderers import ORJSONRenderer
 from streaming.generators import AnthropicSSEGenerator
 from django.http import Http404
 from ninja.errors import HttpError
@@ -35,42 +37,54 @@ from apps.threads.services import (
 from apps.threads.models import Thread, Message, HumanMessage, AssistantMessage
 from django.contrib.auth import get_user_model
 import jwt
-from django.conf import settings
-from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import AnonymousUser, Group
+from django.db.models import Exists, OuterRef
 from asgiref.sync import sync_to_async
 
 User = get_user_model()
 
 
 async def get_user_from_token(request):
-    """Extract and validate JWT token from request."""
-    auth_header = request.headers.get('authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return AnonymousUser()
+    """
+    Extract and validate JWT token from request.
+
+    The result is kept on the request, so later callers in the same request
+    (e.g. negotiate_user_focus after the agent stream has authenticated)
+    don't decode the token and load the user again.
+    """
+    user = getattr(request, '_token_user', None)
+    if user is None:
+        user = request._token_user = await _resolve_token_user(request)
+    return user
 
-    token = auth_header[7:]  # Remove 'Bearer ' prefix
+
+async def _resolve_token_user(request):
+    token = bearer_token(request)
+    if token is None:
+        return AnonymousUser()
 
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-        user_id = payload.get('user_id')
-        if user_id:
-            try:
-                user = await sync_to_async(User.objects.get)(id=user_id)
-                # Django User objects are considered authenticated by default
-                return user
-            except User.DoesNotExist:
-                pass
-    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, KeyError):
-        pass
+        user_id = await verify_token(token)
+    except jwt.InvalidTokenError:
+        return AnonymousUser()
 
-    return AnonymousUser()
+    # Django User objects are considered authenticated by default. The employer
+    # flag rides along in the same query for check_employer_permissions().
+    user = await User.objects.filter(id=user_id).annotate(
+        is_employer=Exists(Group.objects.filter(user=OuterRef('pk'), name='employer'))
+    ).afirst()
+    if user is None:
+        return AnonymousUser()
+    user._is_employer = user.is_employer
+    return user
 
 
 # Initialize the API
 api = NinjaAPI(
     title="Yes Human Agent API",
     version="1.0.0",
-    description="API for Yes Human Agent Stack with MCP and A2A support"
+    description="API for Yes Human Agent Stack with MCP and A2A support",
+    renderer=ORJSONRenderer()
 )
 
 # Add auth router
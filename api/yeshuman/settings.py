@@ -139,6 +139,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# N+1 query detection in development (optional dependency: nplusone)
+if DEBUG:
+    try:
+        import nplusone  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        INSTALLED_APPS.append('nplusone.ext.django')
+        MIDDLEWARE.insert(0, 'nplusone.ext.django.NPlusOneMiddleware')
+        NPLUSONE_RAISE = False  # Log lazy loads instead of failing requests
+
 # CORS settings - configurable via environment variable
 # Explicit origins allowed in development: 3000–3004 and 8000–8004
 CORS_ALLOWED_ORIGINS_DEFAULTS = [
@@ -222,6 +233,12 @@ import dj_database_url
 
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# pgvector HNSW search settings applied per connection: a wider candidate list
+# than the default 40, and iterative scans so filtered ANN queries (threshold,
+# organisation/location filters) keep scanning the index until the page is full
+# instead of returning short results (needs pgvector >= 0.8)
+PGVECTOR_SEARCH_OPTIONS = '-c hnsw.ef_search=64 -c hnsw.iterative_scan=strict_order'
+
 if DATABASE_URL:
     # Use Railway's DATABASE_URL for production
     DATABASES = {
@@ -234,6 +251,7 @@ if DATABASE_URL:
     # Railway optimization: Disable connection pooling for faster cold starts
     DATABASES['default']['CONN_MAX_AGE'] = 0  # Disable persistent connections
     DATABASES['default']['OPTIONS'] = {
+        'options': PGVECTOR_SEARCH_OPTIONS,
         'connect_timeout': 10,  # Faster connection timeout
         'keepalives': 1,  # Enable TCP keepalives
         'keepalives_idle': 30,  # TCP keepalive idle time
@@ -253,6 +271,7 @@ else:
                 'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'password'),
                 'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
                 'PORT': os.getenv('POSTGRES_PORT', '5432'),
+                'OPTIONS': {'options': PGVECTOR_SEARCH_OPTIONS},
             }
         }
     else:
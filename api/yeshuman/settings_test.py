@@ -0,0 +1,18 @@
+"""
+Django settings for running the test suite.
+
+SQLite cannot host this schema (pgvector VectorField/HalfVectorField,
+ArrayField and pgvector migrations), so tests stay on PostgreSQL and are
+made cheaper instead: a fixed test database name so `--keepdb` can reuse
+it between runs, persistent connections, and a fast password hasher.
+"""
+from .settings import *  # noqa: F401,F403
+
+# Reusable test database (run `./manage.py test --keepdb` to skip re-creating
+# the schema and the pgvector extension on every run). With `--parallel`,
+# Django clones it per worker as test_yeshuman_<n>.
+DATABASES['default']['TEST'] = {'NAME': 'test_yeshuman'}  # noqa: F405
+DATABASES['default']['CONN_MAX_AGE'] = None  # noqa: F405
+
+# Password hashing dominates user-fixture setup; tests don't need PBKDF2
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']